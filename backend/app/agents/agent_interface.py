@@ -4,9 +4,25 @@ Unified agent interface for summarizer, translator, and TTS agents.
 """
 
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+from app.utils.metrics import instrument_agent_run
 
 
 class AgentBase(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every concrete run() reports its duration and errors to /metrics
+        if "run" in cls.__dict__:
+            cls.run = instrument_agent_run(cls.__name__, cls.__dict__["run"])
+
     @abstractmethod
     def run(self, text: str, **kwargs):
         pass
+
+    def run_stream(self, texts: Iterable[str], **kwargs) -> Iterator[dict]:
+        """
+        Run the agent incrementally over a stream of text blocks
+        (e.g. pages from helpers.iter_text_blocks), yielding one result per block.
+        """
+        for text in texts:
+            yield self.run(text, **kwargs)
@@ -1,12 +1,145 @@
 # app/agents/summarizer/agent.py
-from transformers import pipeline
-from app.utils.helpers import clean_text, chunk_text
+import os
+from itertools import islice
+from typing import Iterable, Iterator
+from app.utils.helpers import (
+    clean_text,
+    bucket_by_length,
+    iter_clean_text,
+    iter_sentences,
+    iter_token_chunks,
+)
 from app.agents.agent_interface import AgentBase
+from app.agents.summarizer.backends import load_pipeline, MODEL_NAME, BACKEND
+from app.utils.model_registry import model_registry
+
+BATCH_SIZE = int(os.getenv("SUMMARIZER_BATCH_SIZE", "8"))
+# BART reads 1024 tokens; leave headroom for special tokens and tokenizer drift
+CHUNK_TOKENS = int(os.getenv("SUMMARIZER_CHUNK_TOKENS", "900"))
+CHUNK_OVERLAP = int(os.getenv("SUMMARIZER_CHUNK_OVERLAP", "32"))
+# "truncate" (first N lines/words/chars) or "hierarchical" (model map-reduce)
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "truncate")
+DEFAULT_SUMMARY_WORDS = 120
+# Rough conversions used to turn line/char constraints into a word target
+WORDS_PER_LINE = 15
+CHARS_PER_WORD = 6
+MAX_REDUCE_LEVELS = 5
+# Smallest per-chunk summary (in tokens) when squeezing a reduce level into one window
+MIN_REDUCE_TOKENS = 16
+
+# SUMMARIZER_BACKEND picks fp32 torch, int8 quantized or ONNX Runtime
+model_registry.register("summarizer", lambda: load_pipeline(BACKEND))
 
 
 class SummarizerAgent(AgentBase):
-    def __init__(self):
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+    # Part of cached result keys; change it when summaries would change
+    VERSION = f"{MODEL_NAME}/{BACKEND}/1"
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+
+    @property
+    def summarizer(self):
+        # Shared pipeline, loaded on first use
+        return model_registry.get("summarizer")
+
+    def count_tokens(self, text: str) -> int:
+        tokenizer = self.summarizer.tokenizer
+        return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def iter_chunks(self, texts: Iterable[str]) -> Iterator[dict]:
+        """Sentence-packed chunks that fill, but never overflow, the model window."""
+        return iter_token_chunks(
+            texts,
+            count_tokens=self.count_tokens,
+            max_tokens=CHUNK_TOKENS,
+            overlap_tokens=CHUNK_OVERLAP,
+        )
+
+    @staticmethod
+    def _length_limits(word_count: int):
+        max_length = min(250, max(20, word_count // 2))
+        min_length = min(20, max_length)
+        return max_length, min_length
+
+    def _summarize_batch(self, batch: list, limits: tuple = None) -> list:
+        """
+        Summarize a list of similar-length chunks in one forward pass.
+        Returns a list of (summary, error) pairs in the same order.
+        """
+        # Limits come from the longest chunk so none is cut short; buckets hold
+        # similar lengths, and max_length is only an upper bound for the rest
+        max_length, min_length = limits or self._length_limits(
+            max(len(chunk.split()) for chunk in batch)
+        )
+        try:
+            results = self.summarizer(
+                batch,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                batch_size=len(batch),
+            )
+            return [(result["summary_text"], None) for result in results]
+        except Exception as e:
+            if len(batch) == 1:
+                return [(None, str(e))]
+        # Retry one by one so a single bad chunk does not sink the whole batch
+        outputs = []
+        for chunk in batch:
+            outputs.extend(self._summarize_batch([chunk], limits))
+        return outputs
+
+    def _summarize_chunks(self, chunks: list, limits: tuple = None):
+        """
+        Summarize chunks in length buckets.
+        Returns (summaries, errors) in document order.
+        """
+        outputs = [None] * len(chunks)
+        buckets = bucket_by_length([len(c.split()) for c in chunks], self.batch_size)
+        for bucket in buckets:
+            results = self._summarize_batch([chunks[i] for i in bucket], limits)
+            for i, result in zip(bucket, results):
+                outputs[i] = result
+        summaries = [summary for summary, _ in outputs if summary]
+        errors = [error for _, error in outputs if error]
+        return summaries, errors
+
+    def run_stream(self, texts: Iterable[str], **kwargs) -> Iterator[dict]:
+        """
+        Summarize a stream of text blocks, yielding a partial result every few
+        batches of chunks instead of waiting for the whole document.
+        """
+        chunks = (chunk["text"] for chunk in self.iter_chunks(iter_clean_text(texts)))
+        window = self.batch_size * 4
+        while True:
+            batch = list(islice(chunks, window))
+            if not batch:
+                break
+            summaries, errors = self._summarize_chunks(batch)
+            yield {
+                "task": "summarization",
+                "input_length": sum(len(chunk.split()) for chunk in batch),
+                "output": " ".join(summaries),
+                "error": "; ".join(errors) if errors else None,
+            }
+
+    def summarize_chunks(self, chunks: list, limits: tuple = None) -> list:
+        """
+        (summary, error) for each window-sized chunk (see iter_chunks), in
+        order, batched in one forward pass where possible.
+        limits: (max_length, min_length), e.g. from chunk_limits().
+        """
+        return self._summarize_batch(chunks, limits)
+
+    def chunk_limits(self, chunk_count: int, lines=None, chars=None, words=None):
+        """
+        (max_length, min_length) per chunk so that chunk_count summaries add
+        up to roughly the lines/words/chars target.
+        """
+        target = self._target_words(lines, chars, words)
+        max_length = max(20, min(250, int(target / max(1, chunk_count) * 1.3)))
+        return max_length, min(20, max_length // 2)
 
     def run(self, text: str, **kwargs) -> dict:
         """Summarize text in chunks to avoid model limits."""
@@ -19,21 +152,8 @@ class SummarizerAgent(AgentBase):
                 "error": "No text to summarize.",
             }
 
-        chunks = chunk_text(cleaned_text, max_chars=500)
-        summaries = []
-        errors = []
-
-        for chunk in chunks:
-            try:
-                max_length = min(250, max(20, len(chunk.split()) // 2))
-                min_length = min(20, max_length)
-                summary_result = self.summarizer(
-                    chunk, max_length=max_length, min_length=min_length, do_sample=False
-                )
-                summaries.append(summary_result[0]["summary_text"])
-            except Exception as e:
-                errors.append(str(e))
-
+        chunks = [chunk["text"] for chunk in self.iter_chunks([cleaned_text])]
+        summaries, errors = self._summarize_chunks(chunks)
         final_summary = " ".join(summaries)
         return {
             "task": "summarization",
@@ -52,3 +172,74 @@ class SummarizerAgent(AgentBase):
             return "\n".join(content.splitlines()[:lines])
         # Default summary
         return content[:200]  # Return first 200 chars as summary
+
+    @staticmethod
+    def _target_words(lines=None, chars=None, words=None) -> int:
+        if words:
+            return words
+        if chars:
+            return max(1, chars // CHARS_PER_WORD)
+        if lines:
+            return lines * WORDS_PER_LINE
+        return DEFAULT_SUMMARY_WORDS
+
+    def _apply_constraints(self, text: str, lines=None, chars=None, words=None):
+        if lines and not (chars or words):
+            # Model output is one paragraph; give each sentence its own line
+            text = "\n".join(sentence.strip() for sentence in iter_sentences([text]))
+        if not (lines or chars or words):
+            return text
+        return self.summarize(text, lines=lines, chars=chars, words=words)
+
+    def summarize_hierarchical(self, content, lines=None, chars=None, words=None):
+        """
+        Model-backed summary whose length follows the lines/words/chars
+        constraints regardless of document size.
+        Map: summarize every window-sized chunk (batched).
+        Reduce: repeat on the joined summaries until they fit one window; if
+        that stalls, summarize every window with a budget that makes the
+        summaries fit one window together, so no part of the text is dropped.
+        Final: one pass sized to the target, then enforce the constraints.
+        Stops as soon as the text is already within the target length.
+        Returns None if the model failed (or the text could not be reduced to
+        one window), like the other pipeline stages.
+        """
+        text = clean_text(content)
+        target_words = self._target_words(lines, chars, words)
+        if len(text.split()) <= target_words:
+            return self._apply_constraints(text, lines, chars, words)
+
+        for _ in range(MAX_REDUCE_LEVELS):
+            if self.count_tokens(text) <= CHUNK_TOKENS:
+                break
+            chunks = [chunk["text"] for chunk in self.iter_chunks([text])]
+            summaries, _ = self._summarize_chunks(chunks)
+            if not summaries:
+                return None
+            reduced = " ".join(summaries)
+            if len(reduced) >= len(text):
+                break  # not shrinking any more
+            text = reduced
+            if len(text.split()) <= target_words:
+                return self._apply_constraints(text, lines, chars, words)
+
+        for _ in range(MAX_REDUCE_LEVELS):
+            if self.count_tokens(text) <= CHUNK_TOKENS:
+                break
+            # The reduce loop stopped short of one window (no shrink, or out of
+            # levels): cap each window's summary so the joined ones fit
+            chunks = [chunk["text"] for chunk in self.iter_chunks([text])]
+            budget = max(MIN_REDUCE_TOKENS, CHUNK_TOKENS * 3 // (4 * len(chunks)))
+            summaries, _ = self._summarize_chunks(chunks, (budget, budget // 2))
+            if not summaries:
+                return None
+            text = " ".join(summaries)
+        if self.count_tokens(text) > CHUNK_TOKENS:
+            return None
+        # BART emits ~1.3 tokens per word; keep the final pass near the target
+        max_length = max(20, min(512, int(target_words * 1.3)))
+        min_length = min(max_length // 2, 56)
+        [(summary, _)] = self._summarize_batch([text], (max_length, min_length))
+        if summary is None:
+            return None
+        return self._apply_constraints(summary, lines, chars, words)
@@ -0,0 +1,102 @@
+# app/agents/summarizer/backends.py
+"""
+Inference backends for the BART summarizer.
+- torch: default fp32 PyTorch pipeline
+- int8:  PyTorch dynamic int8 quantization of the Linear layers
+- onnx:  ONNX Runtime with graph optimizations applied once at export
+         (needs the optional `optimum[onnxruntime]` package)
+Quantized/exported artifacts are cached under SUMMARIZER_ARTIFACT_DIR;
+create them ahead of time with `python -m app.agents.summarizer.export`.
+"""
+
+import os
+
+MODEL_NAME = "facebook/bart-large-cnn"
+BACKEND = os.getenv("SUMMARIZER_BACKEND", "torch")
+ARTIFACT_DIR = os.getenv(
+    "SUMMARIZER_ARTIFACT_DIR", os.path.join("model_cache", "summarizer")
+)
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def _int8_path() -> str:
+    return os.path.join(ARTIFACT_DIR, "int8", "model.pt")
+
+
+def _onnx_dir() -> str:
+    return os.path.join(ARTIFACT_DIR, "onnx")
+
+
+def _quantize(model):
+    import torch
+
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def export_int8() -> str:
+    """Quantize the fp32 model once and cache its state dict."""
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+
+    model = _quantize(AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).eval())
+    os.makedirs(os.path.dirname(_int8_path()), exist_ok=True)
+    torch.save(model.state_dict(), _int8_path())
+    return _int8_path()
+
+
+def export_onnx() -> str:
+    """Export to ONNX and cache the graph-optimized model."""
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTOptimizer
+        from optimum.onnxruntime.configuration import OptimizationConfig
+    except ImportError as e:
+        raise ImportError(
+            "The onnx backend needs `pip install optimum[onnxruntime]`."
+        ) from e
+    from transformers import AutoTokenizer
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(MODEL_NAME, export=True)
+    optimizer = ORTOptimizer.from_pretrained(model)
+    optimizer.optimize(
+        save_dir=_onnx_dir(),
+        optimization_config=OptimizationConfig(optimization_level=2),
+    )
+    AutoTokenizer.from_pretrained(MODEL_NAME).save_pretrained(_onnx_dir())
+    return _onnx_dir()
+
+
+def _load_int8():
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM
+
+    if not os.path.exists(_int8_path()):
+        export_int8()
+    # Build the architecture without fp32 weights, then load the int8 ones
+    config = AutoConfig.from_pretrained(MODEL_NAME)
+    model = _quantize(AutoModelForSeq2SeqLM.from_config(config).eval())
+    # Our own artifact; packed quantized params need the full unpickler
+    model.load_state_dict(torch.load(_int8_path(), weights_only=False))
+    return model
+
+
+def _load_onnx():
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    if not os.path.isdir(_onnx_dir()):
+        export_onnx()
+    return ORTModelForSeq2SeqLM.from_pretrained(_onnx_dir())
+
+
+def load_pipeline(backend: str = BACKEND):
+    """Summarization pipeline for the given backend."""
+    from transformers import AutoTokenizer, pipeline
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend: {backend}")
+    if backend == "torch":
+        return pipeline("summarization", model=MODEL_NAME)
+    model = _load_int8() if backend == "int8" else _load_onnx()
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
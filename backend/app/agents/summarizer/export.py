@@ -0,0 +1,111 @@
+# app/agents/summarizer/export.py
+"""
+One-shot export / quantization of the summarizer, with a quality check.
+Usage:
+    python -m app.agents.summarizer.export --backend int8 --check
+    python -m app.agents.summarizer.export --backend onnx --check
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from app.agents.summarizer.backends import export_int8, export_onnx, load_pipeline
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "quality_sample.json")
+
+
+def _lcs_length(a: list, b: list) -> int:
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b, 1):
+            if x == y:
+                current.append(previous[j - 1] + 1)
+            else:
+                current.append(max(previous[j], current[-1]))
+        previous = current
+    return previous[-1]
+
+
+def _f1(overlap: int, candidate_len: int, reference_len: int) -> float:
+    if not overlap:
+        return 0.0
+    precision = overlap / candidate_len
+    recall = overlap / reference_len
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge(candidate: str, reference: str) -> dict:
+    """ROUGE-1 and ROUGE-L F1 on lowercased whitespace tokens."""
+    cand = candidate.lower().split()
+    ref = reference.lower().split()
+    ref_counts = {}
+    for token in ref:
+        ref_counts[token] = ref_counts.get(token, 0) + 1
+    unigram_overlap = 0
+    for token in cand:
+        if ref_counts.get(token, 0) > 0:
+            ref_counts[token] -= 1
+            unigram_overlap += 1
+    return {
+        "rouge1": _f1(unigram_overlap, len(cand), len(ref)),
+        "rougeL": _f1(_lcs_length(cand, ref), len(cand), len(ref)),
+    }
+
+
+def _summarize_sample(summarizer, texts: list):
+    started = time.perf_counter()
+    outputs = [
+        summarizer(text, max_length=80, min_length=20, do_sample=False)[0][
+            "summary_text"
+        ]
+        for text in texts
+    ]
+    return outputs, time.perf_counter() - started
+
+
+def quality_check(backend: str) -> dict:
+    """Compare the backend's summaries of the bundled sample with fp32 output."""
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        texts = json.load(f)
+    baseline, baseline_seconds = _summarize_sample(load_pipeline("torch"), texts)
+    candidate, candidate_seconds = _summarize_sample(load_pipeline(backend), texts)
+    scores = [rouge(c, b) for c, b in zip(candidate, baseline)]
+    return {
+        "backend": backend,
+        "samples": len(texts),
+        "rouge1": round(sum(s["rouge1"] for s in scores) / len(scores), 4),
+        "rougeL": round(sum(s["rougeL"] for s in scores) / len(scores), 4),
+        "baseline_seconds": round(baseline_seconds, 3),
+        "backend_seconds": round(candidate_seconds, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the summarizer backend.")
+    parser.add_argument("--backend", choices=["int8", "onnx"], required=True)
+    parser.add_argument(
+        "--check", action="store_true", help="compare ROUGE against fp32"
+    )
+    parser.add_argument(
+        "--min-rougeL",
+        type=float,
+        default=0.7,
+        help="fail the check below this ROUGE-L F1 against fp32",
+    )
+    args = parser.parse_args()
+
+    path = export_int8() if args.backend == "int8" else export_onnx()
+    print(f"Saved {args.backend} artifacts to {path}")
+    if args.check:
+        report = quality_check(args.backend)
+        print(json.dumps(report, indent=2))
+        if report["rougeL"] < args.min_rougeL:
+            print(f"ROUGE-L below {args.min_rougeL}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,17 @@
 # app/agents/translator/agent.py
 
 from app.agents.agent_interface import AgentBase
-from googletrans import Translator
+from app.agents.translator.engine import TranslationEngine, build_backend, BACKEND
 from app.utils.helpers import clean_text
 
 
 class TranslatorAgent(AgentBase):
     SUPPORTED_LANGS = ["te", "hi"]  # Telugu, Hindi
+    VERSION = f"{BACKEND}/1"  # Part of cached result keys
 
-    def __init__(self):
-
-        self.translator = Translator()
+    def __init__(self, backend: str = BACKEND):
+        # Long texts are split into sentence batches and translated concurrently
+        self.engine = TranslationEngine(build_backend(backend))
 
     def run(self, text: str, target_lang: str = "te", **kwargs) -> dict:
 
@@ -32,11 +33,11 @@ class TranslatorAgent(AgentBase):
             }
 
         try:
-            translated = self.translator.translate(cleaned_text, dest=target_lang)
+            translated = self.engine.translate(cleaned_text, dest=target_lang)
             return {
                 "task": "translation",
                 "input_length": len(cleaned_text),
-                "translated_text": translated.text,
+                "translated_text": translated,
                 "error": None,
             }
         except Exception as e:
@@ -48,7 +49,7 @@ class TranslatorAgent(AgentBase):
             }
 
     def translate(self, content, target_lang=None):
-        # Use googletrans for actual translation if possible
+        """Translated text, or None if the backend failed."""
         cleaned_text = clean_text(content)
         if not cleaned_text:
             return ""
@@ -56,8 +57,7 @@ class TranslatorAgent(AgentBase):
         lang_map = {"telugu": "te", "hindi": "hi", "english": "en"}
         lang = lang_map.get(target_lang, "te") if target_lang else "te"
         try:
-            translated = self.translator.translate(cleaned_text, dest=lang)
-            return translated.text
+            return self.engine.translate(cleaned_text, dest=lang)
         except Exception:
-            # Fallback: reverse string as dummy
-            return cleaned_text[::-1]
+            # Failures must not be cached or passed on as a translation
+            return None
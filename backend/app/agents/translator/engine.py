@@ -0,0 +1,267 @@
+# app/agents/translator/engine.py
+"""
+Chunked translation engine with pluggable backends.
+Text is split into size-bounded sentence batches that are translated
+concurrently (rate limited, with retry and backoff) and reassembled in order.
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.helpers import iter_chunks, bucket_by_length
+from app.utils.model_registry import model_registry
+
+BACKEND = os.getenv("TRANSLATOR_BACKEND", "googletrans")
+BACKEND_URL = os.getenv("TRANSLATOR_URL", "http://127.0.0.1:5000/translate")
+MAX_CHARS = int(os.getenv("TRANSLATOR_MAX_CHARS", "4000"))
+CONCURRENCY = int(os.getenv("TRANSLATOR_CONCURRENCY", "4"))
+RATE_PER_SECOND = float(os.getenv("TRANSLATOR_RATE", "5"))
+RETRIES = int(os.getenv("TRANSLATOR_RETRIES", "3"))
+BACKOFF_SECONDS = float(os.getenv("TRANSLATOR_BACKOFF", "0.5"))
+TIMEOUT_SECONDS = float(os.getenv("TRANSLATOR_TIMEOUT", "30"))
+MARIAN_BATCH_SIZE = int(os.getenv("MARIAN_BATCH_SIZE", "16"))
+MARIAN_MAX_CHARS = int(os.getenv("MARIAN_MAX_CHARS", "400"))
+
+
+class GoogleTransBackend:
+    """googletrans, with one client per worker so HTTP connections are reused."""
+
+    name = "googletrans"
+
+    def __init__(self, pool_size: int = CONCURRENCY):
+        from googletrans import Translator
+
+        self._clients = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            self._clients.put(Translator(timeout=TIMEOUT_SECONDS))
+
+    def translate(self, text: str, dest: str) -> str:
+        client = self._clients.get()
+        try:
+            return client.translate(text, dest=dest).text
+        finally:
+            self._clients.put(client)
+
+
+class HttpBackend:
+    """
+    LibreTranslate-style JSON API: POST {"q", "source", "target"} and read
+    "translatedText". Lets a local stub server stand in for benchmarks and tests.
+    """
+
+    name = "http"
+
+    def __init__(self, url: str = BACKEND_URL):
+        import httpx
+
+        self.url = url
+        self._client = httpx.Client(timeout=TIMEOUT_SECONDS)
+
+    def translate(self, text: str, dest: str) -> str:
+        response = self._client.post(
+            self.url, json={"q": text, "source": "auto", "target": dest}
+        )
+        response.raise_for_status()
+        return response.json()["translatedText"]
+
+
+class MarianBackend:
+    """
+    Offline Helsinki-NLP Marian models, loaded lazily through the model
+    registry and shared across requests. Inputs are translated in
+    length-bucketed batches (see TranslationEngine._translate_local).
+    """
+
+    name = "marian"
+    # target language -> (model, target token for multilingual models)
+    MODELS = {
+        "hi": ("Helsinki-NLP/opus-mt-en-hi", None),
+        "te": ("Helsinki-NLP/opus-mt-en-dra", ">>tel<<"),
+    }
+
+    def __init__(
+        self, batch_size: int = MARIAN_BATCH_SIZE, max_chars: int = MARIAN_MAX_CHARS
+    ):
+        self.batch_size = max(1, batch_size)
+        self.max_chars = max_chars
+        self._locks = {dest: threading.Lock() for dest in self.MODELS}
+        for dest, (model_name, _) in self.MODELS.items():
+            model_registry.register(
+                f"marian-{dest}", lambda model_name=model_name: self._load(model_name)
+            )
+
+    @staticmethod
+    def _load(model_name: str):
+        from transformers import MarianMTModel, MarianTokenizer
+
+        tokenizer = MarianTokenizer.from_pretrained(model_name)
+        model = MarianMTModel.from_pretrained(model_name).eval()
+        return tokenizer, model
+
+    def translate(self, text: str, dest: str) -> str:
+        return self.translate_batch([text], dest)[0]
+
+    def translate_batch(self, texts: list, dest: str) -> list:
+        import torch
+
+        if dest == "en":
+            return list(texts)  # source documents are English
+        if dest not in self.MODELS:
+            raise ValueError(f"No offline translation model for '{dest}'")
+        _, target_token = self.MODELS[dest]
+        if target_token:
+            texts = [f"{target_token} {text}" for text in texts]
+        tokenizer, model = model_registry.get(f"marian-{dest}")
+        # One batch at a time per model; the batch itself uses all cores
+        with self._locks[dest], torch.inference_mode():
+            encoded = tokenizer(
+                texts,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=512,
+            )
+            generated = model.generate(**encoded, max_new_tokens=512)
+        return tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+
+BACKENDS = {
+    GoogleTransBackend.name: GoogleTransBackend,
+    HttpBackend.name: HttpBackend,
+    MarianBackend.name: MarianBackend,
+}
+
+
+def register_backend(name: str, factory):
+    BACKENDS[name] = factory
+
+
+def build_backend(name: str = BACKEND):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translator backend: {name}")
+    return BACKENDS[name]()
+
+
+class RateLimiter:
+    """Token bucket shared by all worker threads; rate <= 0 disables it."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TranslationEngine:
+    def __init__(
+        self,
+        backend,
+        max_chars: int = MAX_CHARS,
+        concurrency: int = CONCURRENCY,
+        rate: float = RATE_PER_SECOND,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+    ):
+        self.backend = backend
+        self.max_chars = max_chars
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self._limiter = RateLimiter(rate, burst=concurrency)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, concurrency), thread_name_prefix="translate"
+        )
+
+    def split(self, text: str, max_chars: int = None, pack_lines: bool = True):
+        """
+        (separator, batch) pairs; "".join(separator + batch) rebuilds the text.
+        Text within max_chars is one batch. Otherwise batches hold whole lines
+        (several per batch when pack_lines), so line breaks survive
+        translation; only lines longer than max_chars are split by sentence.
+        """
+        max_chars = max_chars or self.max_chars
+        if len(text) <= max_chars and (pack_lines or "\n" not in text):
+            return [("", text)]
+        pairs = []
+        lines = []  # lines of the batch being filled
+        size = 0
+
+        def separator():
+            return "\n" if pairs else ""
+
+        for line in text.split("\n"):
+            if lines and (not pack_lines or size + 1 + len(line) > max_chars):
+                pairs.append((separator(), "\n".join(lines)))
+                lines, size = [], 0
+            if len(line) <= max_chars:
+                size += len(line) + (1 if lines else 0)
+                lines.append(line)
+                continue
+            for i, piece in enumerate(iter_chunks([line], max_chars=max_chars)):
+                pairs.append((separator() if i == 0 else " ", piece))
+        if lines:
+            pairs.append((separator(), "\n".join(lines)))
+        return pairs
+
+    def translate(self, text: str, dest: str) -> str:
+        """Translate text of any length; raises if a batch keeps failing."""
+        if hasattr(self.backend, "translate_batch"):
+            return self._translate_local(text, dest)
+        pairs = self.split(text)
+        if len(pairs) == 1:
+            return self._translate_with_retry(pairs[0][1], dest)
+        # map() keeps input order, so the output is reassembled in order
+        translated = self._pool.map(
+            lambda pair: self._translate_with_retry(pair[1], dest), pairs
+        )
+        return "".join(sep + out for (sep, _), out in zip(pairs, translated))
+
+    def _translate_local(self, text: str, dest: str) -> str:
+        """
+        Local models: split into lines, and lines into short sentence groups,
+        that fit the model window and run them in length-sorted batches to
+        limit padding.
+        """
+        pairs = self.split(text, self.backend.max_chars, pack_lines=False)
+        outputs = [batch for _, batch in pairs]
+        todo = [i for i, (_, batch) in enumerate(pairs) if batch.strip()]
+        for bucket in bucket_by_length(
+            [len(pairs[i][1]) for i in todo], self.backend.batch_size
+        ):
+            items = [pairs[todo[j]][1] for j in bucket]
+            results = self.backend.translate_batch(items, dest)
+            for j, result in zip(bucket, results):
+                outputs[todo[j]] = result
+        return "".join(sep + out for (sep, _), out in zip(pairs, outputs))
+
+    def _translate_with_retry(self, text: str, dest: str) -> str:
+        if not text.strip():
+            return text
+        for attempt in range(self.retries + 1):
+            self._limiter.acquire()
+            try:
+                return self.backend.translate(text, dest)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                # Exponential backoff with jitter
+                time.sleep(self.backoff * (2**attempt) * (0.5 + random.random()))
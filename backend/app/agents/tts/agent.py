@@ -1,24 +1,92 @@
 # app/agents/tts/agent.py
 from app.agents.agent_interface import AgentBase
-import tempfile
 import base64
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Iterator
 from gtts import gTTS
-from app.utils.helpers import clean_text, AUDIO_DIR
+from app.utils.helpers import clean_text, iter_chunks
+from app.utils.audio_store import audio_store
 import os
 
-# Ensure AUDIO_DIR exists
-os.makedirs(AUDIO_DIR, exist_ok=True)
+CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "300"))
+CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+# gtts | http (POST {"text", "lang"} -> MP3 bytes, e.g. a local stub server)
+BACKEND = os.getenv("TTS_BACKEND", "gtts")
+TTS_URL = os.getenv("TTS_URL", "http://127.0.0.1:5002/tts")
+TIMEOUT_SECONDS = float(os.getenv("TTS_TIMEOUT", "30"))
+
+# Shared by all requests so total concurrent gTTS calls stay bounded
+_synth_pool = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="tts")
+_http_client = None
+
+
+def _http_synthesize(chunk: str, tts_lang: str) -> bytes:
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        _http_client = httpx.Client(timeout=TIMEOUT_SECONDS)
+    response = _http_client.post(TTS_URL, json={"text": chunk, "lang": tts_lang})
+    response.raise_for_status()
+    return response.content
 
 
 class TTSAgent(AgentBase):
     SUPPORTED_LANGS = ["en", "hi", "te"]
+    VERSION = f"{BACKEND}/1"  # Part of cached result keys
+
+    @staticmethod
+    def _synthesize(chunk: str, tts_lang: str) -> bytes:
+        if BACKEND == "http":
+            return _http_synthesize(chunk, tts_lang)
+        buffer = BytesIO()
+        gTTS(text=chunk, lang=tts_lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    def iter_audio(self, text: str, tts_lang: str = "en") -> Iterator[bytes]:
+        """
+        Synthesize text sentence-chunk by chunk, several chunks at a time,
+        yielding MP3 bytes in order as soon as each chunk is ready.
+        MP3 frames concatenate cleanly, so the pieces form one playable stream.
+        """
+        chunks = iter_chunks([text], max_chars=CHUNK_CHARS)
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(_synth_pool.submit(self._synthesize, chunk, tts_lang))
+            # Keep at most CONCURRENCY chunks ahead of the consumer
+            if len(in_flight) >= CONCURRENCY:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    def _write_audio(self, text: str, tts_lang: str, f):
+        for audio in self.iter_audio(text, tts_lang):
+            f.write(audio)
+
+    def synthesize(self, cleaned_text: str, tts_lang: str) -> str:
+        """Stored audio filename for the text, synthesizing it only once."""
+        return audio_store.get_or_create(
+            cleaned_text,
+            tts_lang,
+            self.VERSION,
+            lambda f: self._write_audio(cleaned_text, tts_lang, f),
+        )
 
-    def run(self, text: str, tts_lang: str = "en", **kwargs) -> dict:
+    def run(
+        self, text: str, tts_lang: str = "en", inline_audio: bool = False, **kwargs
+    ) -> dict:
+        """
+        Synthesize text and return its /audio URL.
+        The MP3 is only inlined as base64 when inline_audio is set.
+        """
         cleaned_text = clean_text(text)
         if not cleaned_text:
             return {
                 "task": "tts",
                 "input_length": 0,
+                "audio_url": None,
                 "audio_base64": None,
                 "file_path": None,
                 "error": "No text to synthesize.",
@@ -28,24 +96,24 @@ class TTSAgent(AgentBase):
             return {
                 "task": "tts",
                 "input_length": len(cleaned_text),
+                "audio_url": None,
                 "audio_base64": None,
                 "file_path": None,
                 "error": f"Unsupported TTS language: {tts_lang}",
             }
 
         try:
-            tts = gTTS(text=cleaned_text, lang=tts_lang)
-            with tempfile.NamedTemporaryFile(
-                dir=AUDIO_DIR, suffix=".mp3", delete=False
-            ) as tmp:
-                tts.save(tmp.name)
-                tmp.seek(0)
-                audio_base64 = base64.b64encode(tmp.read()).decode("utf-8")
-                file_path = tmp.name
+            filename = self.synthesize(cleaned_text, tts_lang)
+            file_path = audio_store.path(filename)
+            audio_base64 = None
+            if inline_audio:
+                with open(file_path, "rb") as f:
+                    audio_base64 = base64.b64encode(f.read()).decode("utf-8")
 
             return {
                 "task": "tts",
                 "input_length": len(cleaned_text),
+                "audio_url": audio_store.url_for(filename),
                 "audio_base64": audio_base64,
                 "file_path": file_path,
                 "error": None,
@@ -55,6 +123,7 @@ class TTSAgent(AgentBase):
             return {
                 "task": "tts",
                 "input_length": len(cleaned_text),
+                "audio_url": None,
                 "audio_base64": None,
                 "file_path": None,
                 "error": str(e),
@@ -67,13 +136,7 @@ class TTSAgent(AgentBase):
         if tts_lang not in self.SUPPORTED_LANGS:
             tts_lang = "en"
         try:
-            # Use a predictable filename based on timestamp
-            import time
-
-            filename = f"audio_{int(time.time())}.mp3"
-            file_path = os.path.join(AUDIO_DIR, filename)
-            tts = gTTS(text=cleaned_text, lang=tts_lang)
-            tts.save(file_path)
-            return file_path
+            # Content-addressed, so repeated narrations reuse the same file
+            return audio_store.path(self.synthesize(cleaned_text, tts_lang))
         except Exception:
             return None
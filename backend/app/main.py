@@ -3,24 +3,93 @@ from dotenv import load_dotenv
 import os
 import threading
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from app.routes.agent_routes import router as agent_router
-from app.utils.helpers import cleanup_temp
+from app.routes.agent_routes import router as agent_router, UPLOAD_DIR
+from app.routes.job_routes import router as job_router
+from app.routes.audio_routes import router as audio_router
+from app.routes.metrics_routes import router as metrics_router
+from app.routes.health_routes import router as health_router
+from app.utils.audio_store import audio_store
+from app.utils.doc_catalog import sync_catalog
+from app.utils.executors import shutdown_pools
+from app.utils.pdf_extract import shutdown_pdf_pool
+from app.utils.job_worker import start_workers, stop_workers
+from app.utils.model_registry import warmup_from_env
+from app.utils.env_vars import PREFORK_WORKER
+from app.utils.metrics import METRICS_DIR, snapshot_forever, write_snapshot
 
 load_dotenv()
 
 app = FastAPI()
 app.include_router(agent_router, prefix="/agents", tags=["Agents"])
+app.include_router(job_router, prefix="/jobs", tags=["Jobs"])
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(health_router, prefix="/health", tags=["Health"])
+app.add_event_handler("startup", warmup_from_env)
+app.add_event_handler("shutdown", shutdown_pools)
+app.add_event_handler("shutdown", shutdown_pdf_pool)
 
 # -----------------------------
-# Serve TTS audio files
+# Serve TTS audio files (range requests + caching headers)
 # -----------------------------
-AUDIO_DIR = "temp_audio"
-if not os.path.exists(AUDIO_DIR):
-    os.makedirs(AUDIO_DIR)
-app.mount("/audio", StaticFiles(directory=AUDIO_DIR), name="audio")
+app.include_router(audio_router, prefix="/audio", tags=["Audio"])
 
 # -----------------------------
-# Start background cleanup
+# Start background audio eviction (walks the in-memory index only)
+# In prefork mode a single sweeper process evicts for all workers
 # -----------------------------
-threading.Thread(target=cleanup_temp, daemon=True).start()
+@app.on_event("startup")
+def start_audio_sweeper():
+    if not os.getenv(PREFORK_WORKER):
+        threading.Thread(target=audio_store.sweep_forever, daemon=True).start()
+
+
+# -----------------------------
+# Prefork workers share their metrics through snapshots in METRICS_DIR
+# -----------------------------
+@app.on_event("startup")
+def start_metrics_snapshots():
+    directory = os.getenv(METRICS_DIR)
+    if os.getenv(PREFORK_WORKER) and directory:
+        threading.Thread(
+            target=snapshot_forever, args=(directory,), daemon=True
+        ).start()
+
+
+@app.on_event("shutdown")
+def write_final_metrics():
+    directory = os.getenv(METRICS_DIR)
+    if os.getenv(PREFORK_WORKER) and directory:
+        write_snapshot(directory)
+
+
+# -----------------------------
+# Once-per-deployment services: catalog backfill and job workers
+# (optional, can also run via python -m app.utils.job_worker).
+# In prefork mode (startup.py) the parent runs these instead of each worker.
+# -----------------------------
+job_workers = []
+
+
+def start_job_workers():
+    count = int(os.getenv("JOB_WORKERS", "0") or 0)
+    if count > 0:
+        job_workers.extend(start_workers(count))
+
+
+def stop_job_workers():
+    stop_workers(job_workers)
+
+
+@app.on_event("startup")
+def start_shared_services():
+    if os.getenv(PREFORK_WORKER):
+        return
+    # Backfill the document catalog with files it has not seen yet
+    threading.Thread(target=sync_catalog, args=(UPLOAD_DIR,), daemon=True).start()
+    start_job_workers()
+
+
+@app.on_event("shutdown")
+def stop_shared_services():
+    if not os.getenv(PREFORK_WORKER):
+        stop_job_workers()
@@ -1,12 +1,40 @@
 # app/routes/agent_routes.py
 
+import base64
+import json
 import os
-from fastapi import APIRouter, UploadFile, File, Form
-from app.utils.intent_detector import detect_intent
-from app.utils.process_doc import process_document_from_path
-from app.agents.summarizer.agent import SummarizerAgent
-from app.agents.translator.agent import TranslatorAgent
-from app.agents.tts.agent import TTSAgent
+from fastapi import APIRouter, UploadFile, File, Form, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from app.utils.intent_detector import detect_intent_async, intent_cache_info
+from app.utils.process_doc import (
+    process_document_from_path,
+    iter_process_document,
+    tts_agent,
+    planned_stages,
+    stage_cache_keys,
+    cached_stage_output,
+)
+from app.utils.result_cache import result_cache
+from app.utils.helpers import clean_text
+from app.utils.audio_store import audio_store
+from app.utils.extract_cache import extraction_cache, cached_extract_text
+from app.utils.executors import cpu_pool, io_pool, pool_stats, PoolFullError
+from app.utils.admission import (
+    gates,
+    acquire_all,
+    release_all,
+    admission_stats,
+    AdmissionRejected,
+)
+from app.utils.model_registry import model_registry, current_rss_bytes
+from app.utils.chunk_index import focused_text
+from app.utils.doc_catalog import catalog, ingest_document
+from app.agents.summarizer.agent import SUMMARY_MODE
+from app.utils.uploads import save_upload, UploadRejected
+from app.utils.metrics import RequestTimings, REQUESTS, count_error
+from app.utils.stream_pipeline import ChunkPipeline
+from app.utils.constants import AgentTasks
 
 router = APIRouter()
 
@@ -15,76 +43,414 @@ UPLOAD_DIR = "uploaded_docs"
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
-# Instantiate agents
-summarizer_agent = SummarizerAgent()
-translator_agent = TranslatorAgent()
-tts_agent = TTSAgent()
-
 
 @router.post("/admin/upload-doc/")
 async def admin_upload_doc(file: UploadFile = File(...)):
-    """Admin uploads document to server."""
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
-    return {"filename": file.filename, "status": "uploaded"}
+    """
+    Admin uploads document to server.
+    The file is streamed to disk; identical content is stored only once.
+    """
+    try:
+        saved = await save_upload(file, UPLOAD_DIR)
+    except UploadRejected as e:
+        return JSONResponse(status_code=e.status_code, content={"error": str(e)})
+    if saved["status"] == "uploaded":
+        # Extract metadata and build the chunk index in the background;
+        # if skipped the document stays "pending" and the index is built lazily
+        try:
+            cpu_pool.submit(
+                ingest_document, os.path.join(UPLOAD_DIR, saved["filename"])
+            )
+        except PoolFullError:
+            pass
+    return saved
 
 
 @router.get("/user/list-docs/")
-async def user_list_docs():
-    """List all uploaded documents for user to select."""
-    files = os.listdir(UPLOAD_DIR)
-    return {"documents": files}
+async def user_list_docs(
+    limit: int = Query(50, ge=1, le=500),
+    after: str = None,
+    status: str = None,
+    ext: str = None,
+    q: str = None,
+):
+    """
+    List uploaded documents for user to select, from the document catalog.
+    Paginate by passing the returned `next` as `after`; filter by
+    extraction status, extension or a name substring.
+    "documents" holds just the names, "items" the precomputed metadata.
+    """
+    items, next_cursor = await io_pool.run(
+        catalog.list, limit, after, status, ext, q
+    )
+    return {
+        "documents": [item["name"] for item in items],
+        "items": items,
+        "next": next_cursor,
+    }
+
+
+@router.get("/intent/metrics/")
+async def intent_metrics():
+    """Prompt cache counters, encoder queue depth and batch-size distribution."""
+    return intent_cache_info()
+
+
+@router.get("/models/")
+async def models_status():
+    """Which shared models are loaded, their load times and memory use."""
+    return {"process_rss_bytes": current_rss_bytes(), "models": model_registry.stats()}
+
+
+@router.get("/cache/metrics/")
+async def cache_metrics():
+    """Extraction, stage result and audio store counters."""
+    return {
+        "extraction": extraction_cache.stats(),
+        "results": result_cache.stats(),
+        "audio": audio_store.stats(),
+    }
+
+
+@router.get("/pools/metrics/")
+async def pools_metrics():
+    """Size, in-flight work and rejections for each worker pool."""
+    return pool_stats()
+
+
+@router.get("/admission/metrics/")
+async def admission_metrics():
+    """Per-agent concurrency limits, occupancy, queue and rejection counters."""
+    return admission_stats()
 
 
 @router.post("/process-prompt/")
 async def process_prompt(
     file_name: str = Form(...),
     prompt: str = Form(...),
+    inline_audio: bool = Form(False),
+    summary_mode: str = Form(None),
+    timings: bool = Form(False),
+    profile: bool = Form(False),
 ):
     """
     User selects a file (by name) and provides a prompt.
     Detects intents and processes each intent using local agents.
+    Audio is returned as an /audio URL, or also inlined as base64 on request.
+    summary_mode: "truncate", "hierarchical", or "focused" to only summarize
+    the chunks most relevant to the prompt (defaults to SUMMARY_MODE).
+    timings: add per-stage wall times (ms) to the response.
+    profile: dump a cProfile of the request's work to PROFILE_DIR (if set).
     """
     file_path = os.path.join(UPLOAD_DIR, file_name)
 
     if not os.path.exists(file_path):
+        REQUESTS.inc(route="process_prompt", outcome="not_found")
         return {"error": f"File '{file_name}' not found."}
+    if summary_mode not in (None, "truncate", "hierarchical", "focused"):
+        REQUESTS.inc(route="process_prompt", outcome="bad_request")
+        return {"error": f"Unsupported summary mode: {summary_mode}"}
 
-    # Detect intents and constraints from prompt
-    intents, constraints = detect_intent(prompt, return_constraints=True)
-    results = {}
-    # Extract text from file
-    from app.utils.helpers import extract_text
+    timer = RequestTimings(profile=profile)
+    try:
+        response = await _run_prompt(file_path, prompt, summary_mode, timer)
+    except (AdmissionRejected, PoolFullError) as e:
+        REQUESTS.inc(route="process_prompt", outcome="busy")
+        return _busy_response(e)
+    audio_url = response.get("results", {}).get("tts")
+    if inline_audio and audio_store.has_url(audio_url):
+        try:
+            response["results"]["tts_base64"] = await io_pool.run(
+                _read_base64, audio_store.path(os.path.basename(audio_url))
+            )
+        except FileNotFoundError:
+            response["results"]["tts_error"] = "Audio was evicted, retry the prompt."
+    REQUESTS.inc(
+        route="process_prompt", outcome="error" if response.get("error") else "ok"
+    )
+    if timings:
+        response["timings"] = timer.as_dict()
+    if profile:
+        response["profile"] = timer.dump()
+    return response
+
+
+@router.post("/process-prompt/stream/")
+async def process_prompt_stream(
+    file_name: str = Form(...),
+    prompt: str = Form(...),
+):
+    """
+    Pipelined variant of /process-prompt/ streamed as Server-Sent Events.
+    Chunks flow through summarize -> translate -> tts concurrently; each
+    partial result is sent as soon as it is ready:
+        event: intents    {"intents": [...]}
+        event: summary    {"index", "text"}       (per chunk)
+        event: translate  {"index", "text"}
+        event: tts        {"index", "audio_url"}  (play in index order)
+        event: chunk      {"index", "text"}       (source chunk, no summary asked)
+        event: error      {"stage", "index", "error"}
+        event: done       {"timings"}
+    Summary lengths follow lines/words/chars approximately, and results are
+    not cached. The stream holds a slot of every agent it uses until its
+    pipeline has stopped, even when the client leaves early.
+    """
+    file_path = os.path.join(UPLOAD_DIR, file_name)
+    if not os.path.exists(file_path):
+        return {"error": f"File '{file_name}' not found."}
+
+    timer = RequestTimings()
+    try:
+        intents, constraints, content = await _prepare_prompt(
+            file_path, prompt, timer
+        )
+    except ValueError as e:
+        REQUESTS.inc(route="process_prompt_stream", outcome="error")
+        return {"error": str(e)}
+    except PoolFullError as e:
+        REQUESTS.inc(route="process_prompt_stream", outcome="busy")
+        return _busy_response(e)
+    try:
+        with timer.stage("admission"):
+            permits = await acquire_all(
+                [name for name, _, _ in planned_stages(intents)], len(content)
+            )
+    except AdmissionRejected as e:
+        REQUESTS.inc(route="process_prompt_stream", outcome="busy")
+        return _busy_response(e)
+    REQUESTS.inc(route="process_prompt_stream", outcome="ok")
 
-    extract_result = extract_text(file_path)
+    pipeline = ChunkPipeline(
+        content,
+        intents,
+        constraints,
+        timer,
+        on_finished=lambda: release_all(permits),
+    )
+
+    def event_stream():
+        # Sync generator: Starlette iterates it in a worker thread
+        yield _sse("intents", {"intents": intents})
+        for event, data in pipeline.events_iter():
+            yield _sse(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs after the response, also on disconnect: stops the stages, and
+        # the permits go back once they (and their pool work) have exited
+        background=BackgroundTask(pipeline.close),
+    )
+
+
+def _busy_response(error: Exception) -> JSONResponse:
+    """429 for work refused at capacity, with a Retry-After hint in seconds."""
+    retry_after = getattr(error, "retry_after", 1)
+    return JSONResponse(
+        status_code=429,
+        content={"error": str(error), "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _read_base64(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+async def _prepare_prompt(file_path: str, prompt: str, timer: RequestTimings):
+    """Detect intents and extract the document; returns (intents, constraints, text)."""
+    # Detect intents and constraints from prompt
+    with timer.stage("intent", len(prompt)):
+        intents, constraints = await detect_intent_async(
+            prompt, return_constraints=True
+        )
+    # Extract text from file (cached by content hash)
+    with timer.stage("extract"):
+        extract_result = await cpu_pool.run(
+            timer.wrap(cached_extract_text), file_path
+        )
     if extract_result["error"]:
-        return {"error": extract_result["error"]}
-    content = extract_result["text"].strip()
+        count_error("extract")
+        raise ValueError(extract_result["error"])
+    return intents, constraints, extract_result["text"].strip()
+
+
+async def _run_stages(
+    file_path: str,
+    content: str,
+    stages: list,
+    constraints: dict,
+    timer: RequestTimings,
+):
+    """
+    Run pipeline stages in order, feeding each output into the next stage.
+    A stage that fails (returns None) ends the chain; its result is None.
+    Each uncached stage first takes a slot of its agent's admission gate
+    (smaller inputs are admitted first); AdmissionRejected propagates, and a
+    retry resumes from the stages already cached.
+    Returns (results, last output).
+    """
+    results = {}
     processed_content = content
-    # Chain processing: summarize -> translate -> tts
-    # Always process in the order: summarize, translate, tts/play
-    # Use constraints for each step if present
-    if "summarize" in intents:
-        lines = constraints.get("lines")
-        chars = constraints.get("chars")
-        words = constraints.get("words")
-        summary = summarizer_agent.summarize(
-            processed_content, lines=lines, chars=chars, words=words
+    # Model work runs on the cpu pool, network calls on the io pool
+    # Stage outputs are cached per document hash, so repeats skip finished stages
+    doc_hash = extraction_cache.file_digest(file_path)
+    for (name, result_key, stage), key in zip(
+        stages, stage_cache_keys(doc_hash, stages, constraints)
+    ):
+        output = cached_stage_output(key, name)
+        if output is None:
+            pool = cpu_pool if name == "summarize" else io_pool
+            size = len(processed_content or "")
+            with timer.stage(f"{name}_admission"):
+                permit = await gates[name].acquire(size)
+            try:
+                with timer.stage(name, size):
+                    output = await pool.run(
+                        timer.wrap(stage), processed_content, constraints
+                    )
+            finally:
+                permit.release()
+            if output is None:
+                count_error(name)
+            result_cache.put(key, output)
+        results[result_key] = output
+        processed_content = output
+        if output is None:
+            break
+    return results, processed_content
+
+
+async def _run_prompt(
+    file_path: str, prompt: str, summary_mode: str, timer: RequestTimings
+) -> dict:
+    try:
+        intents, constraints, content = await _prepare_prompt(
+            file_path, prompt, timer
         )
-        results["summary"] = summary
-        processed_content = summary
-    if "translate" in intents:
-        target_lang = constraints.get("target_lang")
-        if target_lang:
-            translation = translator_agent.translate(
-                processed_content, target_lang=target_lang
+    except ValueError as e:
+        return {"error": str(e)}
+    constraints["summary_mode"] = summary_mode or SUMMARY_MODE
+    if constraints["summary_mode"] == "focused" and "summarize" in intents:
+        # Only the top-k chunks closest to the prompt reach the summarizer
+        with timer.stage("retrieve"):
+            content = await cpu_pool.run(
+                timer.wrap(focused_text), file_path, prompt
             )
-        else:
-            translation = translator_agent.translate(processed_content)
-        results["translate"] = translation
-        processed_content = translation
-    if "tts" in intents or "play" in intents:
-        audio_path = tts_agent.text_to_speech(processed_content)
-        results["tts"] = audio_path
+        constraints["focus_query"] = prompt
+    # Chain processing: summarize -> translate -> tts
+    # Use constraints for each step if present
+    results, _ = await _run_stages(
+        file_path, content, planned_stages(intents), constraints, timer
+    )
     return {"intents": intents, "results": results}
+
+
+@router.post("/tts/stream/")
+async def stream_tts(
+    file_name: str = Form(...),
+    prompt: str = Form(...),
+):
+    """
+    Run the prompt's summarize/translate stages, then stream the narration as
+    MP3 while later sentence chunks are still being synthesized.
+    """
+    file_path = os.path.join(UPLOAD_DIR, file_name)
+    if not os.path.exists(file_path):
+        return {"error": f"File '{file_name}' not found."}
+
+    timer = RequestTimings()
+    try:
+        intents, constraints, content = await _prepare_prompt(
+            file_path, prompt, timer
+        )
+        stages = [stage for stage in planned_stages(intents) if stage[0] != "tts"]
+        _, processed_content = await _run_stages(
+            file_path, content, stages, constraints, timer
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+    except (AdmissionRejected, PoolFullError) as e:
+        return _busy_response(e)
+
+    cleaned_text = clean_text(processed_content or "")
+    if not cleaned_text:
+        return {"error": "No text to synthesize."}
+    try:
+        permit = await gates["tts"].acquire(len(cleaned_text))
+    except AdmissionRejected as e:
+        return _busy_response(e)
+
+    def audio_stream():
+        try:
+            yield from tts_agent.iter_audio(cleaned_text)
+        finally:
+            permit.release()
+
+    return StreamingResponse(
+        audio_stream(),
+        media_type="audio/mpeg",
+        background=BackgroundTask(permit.release),
+    )
+
+
+@router.post("/process-document/stream/")
+async def process_document_stream(
+    file_name: str = Form(...),
+    task: str = Form(...),
+    target_lang: str = Form(None),
+):
+    """
+    Run one agent (summarize, translate or tts) over a document page by page,
+    streamed as Server-Sent Events:
+        event: partial  the agent's result for the next block of pages
+        event: done     {}
+    Extraction is streamed too, so memory stays bounded by a few pages however
+    large the document is, and the first result arrives before the last page
+    has been read. Results are not cached.
+    """
+    file_path = os.path.join(UPLOAD_DIR, file_name)
+    if not os.path.exists(file_path):
+        return {"error": f"File '{file_name}' not found."}
+    task = task.lower()
+    tasks = (AgentTasks.SUMMARIZE, AgentTasks.TRANSLATE, AgentTasks.TEXT_TO_SPEECH)
+    if task not in tasks:
+        return {"error": f"Unsupported task '{task}'"}
+    kwargs = {"target_lang": target_lang} if target_lang else {}
+
+    try:
+        permit = await gates[task].acquire(os.path.getsize(file_path))
+    except AdmissionRejected as e:
+        REQUESTS.inc(route="process_document_stream", outcome="busy")
+        return _busy_response(e)
+    REQUESTS.inc(route="process_document_stream", outcome="ok")
+    started = []
+
+    def event_stream():
+        # Sync generator: Starlette iterates it in a worker thread, and the
+        # agent runs inside it, so the permit is held until the work stops
+        started.append(True)
+        try:
+            for partial in iter_process_document(file_path, task, **kwargs):
+                yield _sse("partial", partial)
+            yield _sse("done", {})
+        finally:
+            permit.release()
+
+    def release_unstarted():
+        if not started:
+            permit.release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Only for a client that left before the stream started
+        background=BackgroundTask(release_unstarted),
+    )
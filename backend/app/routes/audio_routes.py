@@ -0,0 +1,93 @@
+# app/routes/audio_routes.py
+
+import os
+import re
+from fastapi import APIRouter, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from app.utils.audio_store import audio_store
+
+router = APIRouter()
+
+FILENAME_PATTERN = re.compile(r"^[\w.-]+\.mp3$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+BLOCK_BYTES = 64 * 1024
+# Filenames are content hashes, so a URL always maps to the same bytes
+CACHE_HEADERS = {
+    "Cache-Control": "public, max-age=31536000, immutable",
+    "Accept-Ranges": "bytes",
+}
+
+
+def _iter_file(f, start: int, length: int):
+    """Yield length bytes of f from start in fixed-size blocks."""
+    try:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(BLOCK_BYTES, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        f.close()
+
+
+def _file_response(f, start: int, end: int, status_code: int, headers: dict):
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file(f, start, end - start + 1),
+        status_code=status_code,
+        media_type="audio/mpeg",
+        headers=headers,
+        # Closes the file even if the body is never read
+        background=BackgroundTask(f.close),
+    )
+
+
+@router.api_route("/{filename}", methods=["GET", "HEAD"])
+async def get_audio(filename: str, request: Request):
+    """Serve stored narration with HTTP range and caching support."""
+    if not FILENAME_PATTERN.match(filename):
+        return Response(status_code=404)
+    etag = f'"{filename[:-4]}"'
+    headers = {**CACHE_HEADERS, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    try:
+        # An open file stays readable even if the sweeper evicts it meanwhile
+        f = open(audio_store.path(filename), "rb")
+    except OSError:
+        return Response(status_code=404)
+    audio_store.touch(filename)
+
+    size = os.fstat(f.fileno()).st_size
+    range_header = request.headers.get("range")
+    if not range_header:
+        if request.method == "HEAD":
+            f.close()
+            headers["Content-Length"] = str(size)
+            return Response(status_code=200, media_type="audio/mpeg", headers=headers)
+        return _file_response(f, 0, size - 1, 200, headers)
+
+    # Single byte range: "bytes=start-end", "bytes=start-" or "bytes=-suffix"
+    m = RANGE_PATTERN.match(range_header.strip())
+    if not m or m.group(1) == m.group(2) == "":
+        f.close()
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        start = max(0, size - int(m.group(2)))
+        end = size - 1
+    if start > end or start >= size:
+        f.close()
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if request.method == "HEAD":
+        f.close()
+        headers["Content-Length"] = str(end - start + 1)
+        return Response(status_code=206, media_type="audio/mpeg", headers=headers)
+    return _file_response(f, start, end, 206, headers)
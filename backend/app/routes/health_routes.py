@@ -0,0 +1,34 @@
+# app/routes/health_routes.py
+
+import os
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.utils.model_registry import model_registry, warmup_targets, current_rss_bytes
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live():
+    """Liveness: the worker's event loop is answering."""
+    return {"status": "ok", "pid": os.getpid()}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness: every model in WARMUP_MODELS is loaded in this worker.
+    Models outside that list load lazily and do not gate readiness.
+    """
+    models = model_registry.stats()
+    required = warmup_targets()
+    missing = [name for name in required if not models[name]["loaded"]]
+    body = {
+        "status": "ready" if not missing else "warming",
+        "pid": os.getpid(),
+        "process_rss_bytes": current_rss_bytes(),
+        "required": required,
+        "missing": missing,
+        "models": {name: stats["loaded"] for name, stats in models.items()},
+    }
+    return JSONResponse(status_code=503 if missing else 200, content=body)
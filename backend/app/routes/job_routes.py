@@ -0,0 +1,67 @@
+# app/routes/job_routes.py
+
+import os
+from fastapi import APIRouter, Form
+from app.utils.executors import io_pool
+from app.utils.job_queue import JobStore, SUCCEEDED, FINISHED_STATES
+from app.routes.agent_routes import UPLOAD_DIR
+
+router = APIRouter()
+
+job_store = JobStore()
+
+
+def _job_status(job: dict) -> dict:
+    stages = job["stages"]
+    done = sum(1 for stage in stages.values() if stage["status"] == "done")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "progress": round(done / len(stages), 2) if stages else 0.0,
+        "stages": stages,
+        "error": job["error"],
+    }
+
+
+@router.post("/")
+async def submit_job(
+    file_name: str = Form(...),
+    prompt: str = Form(...),
+):
+    """Queue a prompt against an uploaded document for background processing."""
+    file_path = os.path.join(UPLOAD_DIR, file_name)
+    if not os.path.exists(file_path):
+        return {"error": f"File '{file_name}' not found."}
+    job_id = await io_pool.run(job_store.submit, file_path, prompt)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Job status with per-stage progress."""
+    job = await io_pool.run(job_store.get, job_id)
+    if job is None:
+        return {"error": f"Job '{job_id}' not found."}
+    return _job_status(job)
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Final pipeline output, same shape as /agents/process-prompt/."""
+    job = await io_pool.run(job_store.get, job_id)
+    if job is None:
+        return {"error": f"Job '{job_id}' not found."}
+    if job["status"] not in FINISHED_STATES:
+        return {"job_id": job_id, "status": job["status"], "error": "Job not finished."}
+    if job["status"] != SUCCEEDED:
+        return {"job_id": job_id, "status": job["status"], "error": job["error"]}
+    return {"job_id": job_id, "status": job["status"], **job["result"]}
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one at its next stage."""
+    status = await io_pool.run(job_store.request_cancel, job_id)
+    if status is None:
+        return {"error": f"Job '{job_id}' not found."}
+    return {"job_id": job_id, "status": status}
@@ -0,0 +1,135 @@
+# app/routes/metrics_routes.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.utils.admission import admission_stats
+from app.utils.audio_store import audio_store
+from app.utils.executors import pool_stats
+from app.utils.extract_cache import extraction_cache
+from app.utils.intent_detector import intent_cache_info
+from app.utils.metrics import registry, Counter, Gauge
+from app.utils.model_registry import model_registry, current_rss_bytes
+from app.utils.result_cache import result_cache
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_metrics():
+    workers = Gauge("docability_pool_workers", "Worker threads per pool.", ("pool",))
+    in_flight = Gauge(
+        "docability_pool_in_flight", "Running plus queued jobs per pool.", ("pool",)
+    )
+    queued = Gauge("docability_pool_queued", "Jobs waiting for a worker.", ("pool",))
+    rejected = Counter(
+        "docability_pool_rejected_total", "Jobs refused by a full pool.", ("pool",)
+    )
+    for name, stats in pool_stats().items():
+        workers.set(stats["workers"], pool=name)
+        in_flight.set(stats["in_flight"], pool=name)
+        queued.set(stats["queued"], pool=name)
+        rejected.inc(stats["rejected"], pool=name)
+    return [workers, in_flight, queued, rejected]
+
+
+def _admission_metrics():
+    limit = Gauge(
+        "docability_admission_limit", "Concurrent requests per agent.", ("agent",)
+    )
+    queue_limit = Gauge(
+        "docability_admission_queue_limit", "Waiters allowed per agent.", ("agent",)
+    )
+    active = Gauge(
+        "docability_admission_active", "Requests holding an agent slot.", ("agent",)
+    )
+    queued = Gauge(
+        "docability_admission_queued", "Requests waiting for a slot.", ("agent",)
+    )
+    admitted = Counter(
+        "docability_admission_admitted_total", "Requests given a slot.", ("agent",)
+    )
+    rejected = Counter(
+        "docability_admission_rejected_total",
+        "Requests refused with 429, by reason.",
+        ("agent", "reason"),
+    )
+    for name, stats in admission_stats().items():
+        limit.set(stats["limit"], agent=name)
+        queue_limit.set(stats["queue_limit"], agent=name)
+        active.set(stats["active"], agent=name)
+        queued.set(stats["queued"], agent=name)
+        admitted.inc(stats["admitted"], agent=name)
+        rejected.inc(stats["rejected"], agent=name, reason="queue_full")
+        rejected.inc(stats["timed_out"], agent=name, reason="deadline")
+    return [limit, queue_limit, active, queued, admitted, rejected]
+
+
+def _cache_metrics():
+    hits = Counter("docability_cache_hits_total", "Cache hits.", ("cache", "tier"))
+    misses = Counter(
+        "docability_cache_misses_total", "Cache misses.", ("cache", "tier")
+    )
+    size = Gauge("docability_cache_bytes", "Bytes held per cache.", ("cache",))
+
+    stats = result_cache.stats()
+    for stage, count in stats["hits"].items():
+        hits.inc(count, cache="result", tier=stage)
+    for stage, count in stats["misses"].items():
+        misses.inc(count, cache="result", tier=stage)
+    size.set(stats["bytes"], cache="result")
+
+    stats = extraction_cache.stats()
+    for tier, count in stats["hits"].items():
+        hits.inc(count, cache="extraction", tier=tier)
+    misses.inc(stats["misses"], cache="extraction", tier="all")
+    size.set(stats["memory_bytes"], cache="extraction")
+
+    info = intent_cache_info()
+    for name in ("embeddings", "intents"):
+        hits.inc(info[name]["hits"], cache="intent", tier=name)
+        misses.inc(info[name]["misses"], cache="intent", tier=name)
+    size.set(audio_store.stats()["bytes"], cache="audio")
+    return [hits, misses, size]
+
+
+def _encoder_metrics():
+    batcher = intent_cache_info()["batcher"]
+    depth = Gauge(
+        "docability_intent_queue_depth", "Prompts waiting for the encoder batch."
+    )
+    batches = Counter("docability_intent_batches_total", "Encoder batches run.")
+    depth.set(batcher["queue_depth"])
+    batches.inc(batcher["batches"])
+    return [depth, batches]
+
+
+def _model_metrics():
+    loaded = Gauge("docability_model_loaded", "1 if the model is loaded.", ("model",))
+    for name, stats in model_registry.stats().items():
+        loaded.set(int(stats["loaded"]), model=name)
+    rss = Gauge("docability_process_rss_bytes", "Resident memory of this process.")
+    rss_bytes = current_rss_bytes()
+    if rss_bytes is not None:
+        rss.set(rss_bytes)
+    return [loaded, rss]
+
+
+for collect in (
+    _pool_metrics,
+    _admission_metrics,
+    _cache_metrics,
+    _encoder_metrics,
+    _model_metrics,
+):
+    registry.register_collector(collect)
+
+
+@router.get("/metrics")
+def metrics():
+    """
+    Prometheus scrape endpoint: stage latencies, sizes, caches, pools,
+    admission gates, errors. Under prefork, merged across the workers
+    (gauges carry a pid label).
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
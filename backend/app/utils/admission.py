@@ -0,0 +1,217 @@
+# app/utils/admission.py
+"""
+Admission control for the agents behind /process-prompt/.
+Each agent (summarize, translate, tts) has a gate: at most `limit` requests
+use it at once and at most `queue_limit` wait for a slot. Waiters are served
+shortest input first, give up after `max_wait` seconds, and anything beyond
+the queue is refused at once, so overload turns into quick 429s instead of
+requests timing out behind a growing backlog.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from app.utils.metrics import registry
+
+QUEUE_LIMIT = int(os.getenv("ADMISSION_QUEUE_SIZE", "16"))
+MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT", "10"))
+
+ADMISSION_WAIT = registry.histogram(
+    "docability_admission_wait_seconds",
+    "Time admitted requests waited for an agent slot.",
+    ("agent",),
+)
+
+
+class AdmissionRejected(RuntimeError):
+    """The agent is at capacity; retry_after is a hint in whole seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+        self.cancelled = False
+
+    def wake(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class Permit:
+    """A held slot; release() is idempotent and safe from any thread."""
+
+    def __init__(self, gate: "AgentGate"):
+        self.gate = gate
+        self.acquired = time.perf_counter()
+        self.released = False
+
+    def release(self):
+        self.gate._release(self)
+
+
+class AgentGate:
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        queue_limit: int = QUEUE_LIMIT,
+        max_wait: float = MAX_WAIT_SECONDS,
+    ):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_limit = max(0, queue_limit)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._active = 0
+        # Heap of (input size, arrival order, waiter): shortest input first
+        self._waiters = []
+        self._queued = 0  # waiters in the heap that are still waiting
+        self._order = itertools.count()
+        self._avg_hold = 1.0  # moving average of seconds a slot is held
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self, size: int = 0, timeout: float = None) -> Permit:
+        """
+        Wait for a slot, favouring smaller inputs; raises AdmissionRejected
+        when the queue is full or the wait exceeds max_wait (or timeout, if
+        shorter; with no time left it does not queue at all).
+        """
+        start = time.perf_counter()
+        wait = self.max_wait if timeout is None else min(self.max_wait, timeout)
+        with self._lock:
+            if self._active < self.limit and not self._queued:
+                self._active += 1
+                self.admitted += 1
+                ADMISSION_WAIT.observe(0.0, agent=self.name)
+                return Permit(self)
+            if wait <= 0:
+                self.timed_out += 1
+                raise AdmissionRejected(
+                    f"Timed out waiting for the {self.name} agent, try again later.",
+                    self._retry_after(),
+                )
+            if self._queued >= self.queue_limit:
+                self.rejected += 1
+                raise AdmissionRejected(
+                    f"The {self.name} agent is at capacity, try again later.",
+                    self._retry_after(),
+                )
+            waiter = _Waiter(asyncio.get_running_loop())
+            heapq.heappush(self._waiters, (size, next(self._order), waiter))
+            self._queued += 1
+
+        try:
+            await asyncio.wait_for(waiter.future, wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if not waiter.granted:
+                    waiter.cancelled = True
+                    self._queued -= 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.timed_out += 1
+            if waiter.granted:
+                # The slot was handed over just as the wait ended
+                if isinstance(e, asyncio.CancelledError):
+                    self._release(Permit(self))
+                    raise
+            elif isinstance(e, asyncio.TimeoutError):
+                raise AdmissionRejected(
+                    f"Timed out waiting for the {self.name} agent, try again later.",
+                    self._retry_after(),
+                ) from None
+            else:
+                raise
+        ADMISSION_WAIT.observe(time.perf_counter() - start, agent=self.name)
+        return Permit(self)
+
+    @asynccontextmanager
+    async def slot(self, size: int = 0):
+        permit = await self.acquire(size)
+        try:
+            yield permit
+        finally:
+            permit.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "queue_limit": self.queue_limit,
+                "max_wait": self.max_wait,
+                "active": self._active,
+                "queued": self._queued,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_hold_seconds": round(self._avg_hold, 3),
+            }
+
+    def _retry_after(self) -> int:
+        # Roughly how long until the current backlog has drained
+        backlog = (self._queued + 1) / self.limit
+        return max(1, math.ceil(self._avg_hold * backlog))
+
+    def _release(self, permit: Permit):
+        with self._lock:
+            if permit.released:
+                return
+            permit.released = True
+            held = time.perf_counter() - permit.acquired
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held
+            # Hand the slot straight to the next live waiter, if any
+            while self._waiters:
+                _, _, waiter = heapq.heappop(self._waiters)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                self._queued -= 1
+                self.admitted += 1
+                waiter.loop.call_soon_threadsafe(waiter.wake)
+                return
+            self._active -= 1
+
+
+gates = {
+    name: AgentGate(name, int(os.getenv(f"ADMISSION_{name.upper()}_LIMIT", limit)))
+    for name, limit in (("summarize", "2"), ("translate", "4"), ("tts", "4"))
+}
+
+
+async def acquire_all(names: list, size: int = 0) -> list:
+    """
+    Permits for several agents (in the given order) for work that holds them
+    together. All waits share one MAX_WAIT_SECONDS deadline; on rejection the
+    permits already taken are released.
+    """
+    deadline = time.monotonic() + MAX_WAIT_SECONDS
+    permits = []
+    try:
+        for name in names:
+            remaining = deadline - time.monotonic()
+            permits.append(await gates[name].acquire(size, timeout=remaining))
+    except BaseException:
+        release_all(permits)
+        raise
+    return permits
+
+
+def release_all(permits: list):
+    for permit in permits:
+        permit.release()
+
+
+def admission_stats() -> dict:
+    return {name: gate.stats() for name, gate in gates.items()}
@@ -0,0 +1,174 @@
+# app/utils/audio_store.py
+"""
+Content-addressed store for synthesized audio.
+Files are named by a hash of (text, language, voice), so identical narrations
+are generated once. Eviction works from an in-memory index (LRU, byte quota
+and TTL) instead of rescanning the directory.
+Under prefork (startup.py) only the sweeper process evicts, rescanning the
+directory each pass so the quota covers every worker's files; workers record
+access in the file mtime and check the disk before trusting their index.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from app.utils.env_vars import PREFORK_WORKER
+from app.utils.helpers import AUDIO_DIR
+
+MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_MB", "512")) * 1024 * 1024
+TTL_SECONDS = float(os.getenv("AUDIO_TTL", "3600"))
+SWEEP_INTERVAL = float(os.getenv("AUDIO_SWEEP_INTERVAL", "600"))
+URL_PREFIX = "/audio/"
+
+
+class AudioStore:
+    def __init__(
+        self,
+        directory: str = AUDIO_DIR,
+        max_bytes: int = MAX_BYTES,
+        ttl: float = TTL_SECONDS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # filename -> (size, last access), LRU first
+        self._bytes = 0
+        self._write_locks = {}
+        self._load_index()
+
+    @staticmethod
+    def key(text: str, lang: str, voice: str = "") -> str:
+        h = hashlib.sha256()
+        for part in (voice, lang, text):
+            h.update(part.encode("utf-8") + b"\0")
+        return h.hexdigest()[:32]
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    @staticmethod
+    def url_for(filename: str) -> str:
+        return URL_PREFIX + filename
+
+    def get_or_create(self, text: str, lang: str, voice: str, write_fn) -> str:
+        """
+        Return the filename for (text, lang, voice), calling write_fn(f) to
+        produce the audio only if it is not stored yet.
+        """
+        filename = self.key(text, lang, voice) + ".mp3"
+        if self.touch(filename):
+            return filename
+        with self._lock:
+            write_lock = self._write_locks.setdefault(filename, threading.Lock())
+        # Concurrent requests for the same narration wait for one synthesis
+        with write_lock:
+            if self.touch(filename):
+                return filename
+            final_path = self.path(filename)
+            tmp_path = f"{final_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    write_fn(f)
+                os.replace(tmp_path, final_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            finally:
+                with self._lock:
+                    self._write_locks.pop(filename, None)
+            self._add(filename, os.path.getsize(final_path))
+        if not os.getenv(PREFORK_WORKER):
+            self.evict()
+        return filename
+
+    def touch(self, filename: str) -> bool:
+        """Mark a stored file as recently used; False if it is not stored."""
+        try:
+            # The mtime is the last access shared with other processes
+            os.utime(self.path(filename))
+            size = os.path.getsize(self.path(filename))
+        except OSError:
+            # Evicted by another process
+            with self._lock:
+                entry = self._index.pop(filename, None)
+                if entry:
+                    self._bytes -= entry[0]
+            return False
+        self._add(filename, size)
+        return True
+
+    def has_url(self, url: str) -> bool:
+        return (
+            isinstance(url, str)
+            and url.startswith(URL_PREFIX)
+            and os.path.isfile(self.path(url[len(URL_PREFIX):]))
+        )
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones over the quota."""
+        now = time.time()
+        doomed = []
+        with self._lock:
+            for filename, (size, last_access) in list(self._index.items()):
+                if now - last_access > self.ttl or self._bytes > self.max_bytes:
+                    self._index.pop(filename)
+                    self._bytes -= size
+                    doomed.append(filename)
+                else:
+                    # Entries are in LRU order, so the rest are newer and fit
+                    break
+        for filename in doomed:
+            try:
+                os.remove(self.path(filename))
+            except OSError:
+                pass
+
+    def sweep_forever(self, interval: float = SWEEP_INTERVAL, rescan: bool = False):
+        """Evict periodically; rescan picks up files written by other processes."""
+        while True:
+            time.sleep(interval)
+            if rescan:
+                self._load_index()
+            self.evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _add(self, filename: str, size: int):
+        with self._lock:
+            old = self._index.pop(filename, None)
+            if old:
+                self._bytes -= old[0]
+            self._index[filename] = (size, time.time())
+            self._bytes += size
+
+    def _load_index(self):
+        # One directory scan at startup; afterwards the index is authoritative
+        # (except in the prefork sweeper, which rescans every pass)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, entry.name, st.st_size))
+        index = OrderedDict()
+        for mtime, filename, size in sorted(entries):
+            index[filename] = (size, mtime)
+        with self._lock:
+            self._index = index
+            self._bytes = sum(size for size, _ in index.values())
+
+
+audio_store = AudioStore()
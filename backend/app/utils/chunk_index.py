@@ -0,0 +1,111 @@
+# app/utils/chunk_index.py
+"""
+Per-document chunk embedding index for query-focused summarization.
+Built once per upload with the MiniLM encoder and persisted next to the
+document, so targeted prompts only summarize the most relevant chunks.
+"""
+
+import os
+import tempfile
+import numpy as np
+from app.utils.extract_cache import extraction_cache, cached_extract_text
+from app.utils.helpers import iter_token_chunks
+from app.utils.intent_detector import embed_prompt, embed_texts
+
+# MiniLM reads up to 256 word pieces
+CHUNK_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_TOKENS", "200"))
+TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
+INDEX_DIR_NAME = ".index"
+
+
+def index_path(file_path: str) -> str:
+    directory, filename = os.path.split(file_path)
+    return os.path.join(directory, INDEX_DIR_NAME, filename + ".npz")
+
+
+def _flag_in_catalog(file_path: str, available: bool):
+    # Imported here: the catalog module imports this one
+    from app.utils.doc_catalog import catalog
+
+    catalog.set_chunk_index(os.path.basename(file_path), available)
+
+
+def build_index(file_path: str) -> dict:
+    """
+    Chunk, embed and persist a document, flagging it in the document
+    catalog; returns the loaded index.
+    """
+    result = cached_extract_text(file_path)
+    if result["error"]:
+        raise ValueError(result["error"])
+    chunks = list(iter_token_chunks([result["text"]], max_tokens=CHUNK_TOKENS))
+    texts = [chunk["text"] for chunk in chunks]
+    index = {
+        "doc_hash": extraction_cache.file_digest(file_path),
+        "texts": texts,
+        "starts": np.array([chunk["start"] for chunk in chunks], dtype=np.int64),
+        "embeddings": (
+            embed_texts(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+        ),
+    }
+    path = index_path(file_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique temp file, so concurrent builds never install each other's halves
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp.npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                doc_hash=np.array(index["doc_hash"]),
+                # Fixed-width unicode, so loading never needs pickle
+                texts=np.array(texts, dtype=str),
+                starts=index["starts"],
+                embeddings=index["embeddings"],
+            )
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _flag_in_catalog(file_path, True)
+    return index
+
+
+def load_index(file_path: str) -> dict:
+    """Persisted index for the file, rebuilt if missing or stale."""
+    path = index_path(file_path)
+    digest = extraction_cache.file_digest(file_path)
+    try:
+        # Never unpickle: the index lives next to user uploads
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["doc_hash"]) == digest:
+                return {
+                    "doc_hash": digest,
+                    "texts": [str(text) for text in data["texts"]],
+                    "starts": data["starts"],
+                    "embeddings": data["embeddings"],
+                }
+    except (OSError, KeyError, ValueError):
+        pass
+    return build_index(file_path)
+
+
+def focused_text(file_path: str, query: str, top_k: int = TOP_K) -> str:
+    """
+    The top_k chunks most similar to the query, joined in document order.
+    Cosine similarity is a dot product since all embeddings are normalized.
+    """
+    index = load_index(file_path)
+    if not index["texts"]:
+        return ""
+    scores = index["embeddings"] @ embed_prompt(query)
+    best = np.argsort(-scores)[:top_k]
+    return " ".join(index["texts"][i] for i in sorted(best))
+
+
+def remove_index(file_path: str):
+    try:
+        os.remove(index_path(file_path))
+    except OSError:
+        return
+    _flag_in_catalog(file_path, False)
@@ -0,0 +1,194 @@
+# app/utils/doc_catalog.py
+"""
+SQLite-backed catalog of uploaded documents.
+Holds precomputed metadata (hash, size, pages, words, extraction status,
+cached artifacts) so listings never touch the upload directory.
+"""
+
+import os
+import time
+from app.utils.chunk_index import build_index, index_path
+from app.utils.extract_cache import extraction_cache, cached_extract_text
+from app.utils.helpers import count_pages
+from app.utils.sqlite_store import SQLiteStore, row_to_dict
+
+CATALOG_DB_PATH = os.getenv("CATALOG_DB_PATH", "catalog.db")
+
+PENDING = "pending"
+EXTRACTED = "extracted"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    page_count INTEGER,
+    word_count INTEGER,
+    status TEXT NOT NULL,
+    error TEXT,
+    has_text_cache INTEGER NOT NULL DEFAULT 0,
+    has_chunk_index INTEGER NOT NULL DEFAULT 0,
+    uploaded_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_hash ON documents (content_hash);
+CREATE INDEX IF NOT EXISTS documents_status_name ON documents (status, name);
+CREATE INDEX IF NOT EXISTS documents_ext_name ON documents (ext, name);
+"""
+
+_COLUMNS = (
+    "name, ext, content_hash, size, page_count, word_count, status, error,"
+    " has_text_cache, has_chunk_index, uploaded_at, updated_at"
+)
+
+
+class DocumentCatalog(SQLiteStore):
+    TABLE = "documents"
+    KEY = "name"
+    SCHEMA = _SCHEMA
+
+    def __init__(self, db_path: str = CATALOG_DB_PATH):
+        super().__init__(db_path)
+
+    def record_upload(self, name: str, content_hash: str, size: int):
+        """Add or replace a document; metadata is filled in after extraction."""
+        now = time.time()
+        ext = os.path.splitext(name)[1].lower()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO documents ({_COLUMNS})"
+                " VALUES (?, ?, ?, ?, NULL, NULL, ?, NULL, 0, 0, ?, ?)",
+                (name, ext, content_hash, size, PENDING, now, now),
+            )
+
+    def mark_extracted(self, name: str, page_count, word_count: int):
+        self._update(
+            name,
+            status=EXTRACTED,
+            error=None,
+            page_count=page_count,
+            word_count=word_count,
+            has_text_cache=1,
+        )
+
+    def mark_failed(self, name: str, error: str):
+        self._update(name, status=FAILED, error=error)
+
+    def set_chunk_index(self, name: str, available: bool = True):
+        self._update(name, has_chunk_index=int(available))
+
+    def get(self, name: str):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM documents WHERE name = ?", (name,)
+            ).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def find_by_hash(self, content_hash: str):
+        """Name of a stored document with this content, if any."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT name FROM documents WHERE content_hash = ? LIMIT 1",
+                (content_hash,),
+            ).fetchone()
+        return row["name"] if row else None
+
+    def list(
+        self,
+        limit: int = 50,
+        after: str = None,
+        status: str = None,
+        ext: str = None,
+        query: str = None,
+    ):
+        """
+        One page of documents ordered by name.
+        Keyset pagination (pass the last name as `after`) keeps every page
+        an index range scan, however many documents there are.
+        Returns (items, next cursor or None).
+        """
+        clauses = []
+        params = []
+        if after:
+            clauses.append("name > ?")
+            params.append(after)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if ext:
+            clauses.append("ext = ?")
+            params.append(ext.lower() if ext.startswith(".") else "." + ext.lower())
+        if query:
+            clauses.append("name LIKE ?")
+            params.append(f"%{query}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM documents {where} ORDER BY name LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        items = [_row_to_dict(row) for row in rows[:limit]]
+        next_cursor = items[-1]["name"] if len(rows) > limit else None
+        return items, next_cursor
+
+    def names(self) -> set:
+        with self._connect() as conn:
+            return {row["name"] for row in conn.execute("SELECT name FROM documents")}
+
+    def remove(self, name: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents WHERE name = ?", (name,))
+
+
+def _row_to_dict(row) -> dict:
+    return row_to_dict(row, flags=("has_text_cache", "has_chunk_index"))
+
+
+catalog = DocumentCatalog()
+
+
+def ingest_document(file_path: str, chunk_index: bool = True):
+    """
+    Extract a stored document once and record its metadata; optionally
+    build the retrieval chunk index too. Extraction also warms the cache.
+    """
+    name = os.path.basename(file_path)
+    result = cached_extract_text(file_path)
+    if result["error"]:
+        catalog.mark_failed(name, result["error"])
+        return
+    try:
+        pages = count_pages(file_path)
+    except Exception:
+        pages = None
+    catalog.mark_extracted(name, pages, len(result["text"].split()))
+    if chunk_index:
+        build_index(file_path)  # also flags it in the catalog
+
+
+def sync_catalog(upload_dir: str):
+    """
+    Backfill documents that predate the catalog (or were copied in by hand)
+    and drop rows whose files are gone. Meant to run once at startup.
+    """
+    known = catalog.names()
+    present = set()
+    for entry in os.scandir(upload_dir):
+        if entry.name.startswith(".") or not entry.is_file():
+            continue
+        present.add(entry.name)
+        if entry.name in known:
+            continue
+        try:
+            digest = extraction_cache.file_digest(entry.path)
+            catalog.record_upload(entry.name, digest, entry.stat().st_size)
+            # The chunk index may already exist from before the catalog
+            ingest_document(entry.path, chunk_index=False)
+            if os.path.exists(index_path(entry.path)):
+                catalog.set_chunk_index(entry.name)
+        except OSError:
+            continue
+    for name in known - present:
+        catalog.remove(name)
@@ -1 +1,4 @@
 ENVIRONMENT = "ENVIRONMENT"
+
+# Set in processes forked by startup.py's prefork mode
+PREFORK_WORKER = "PREFORK_WORKER"
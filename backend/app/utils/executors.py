@@ -0,0 +1,91 @@
+# app/utils/executors.py
+"""
+Bounded worker pools so blocking agent work runs off the event loop.
+- cpu: model inference and text extraction (torch releases the GIL, and
+  threads share the already-loaded model weights)
+- io:  network-bound translation and TTS calls
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class PoolFullError(RuntimeError):
+    """Raised when a pool already has its maximum of running + queued jobs."""
+
+
+class BoundedPool:
+    def __init__(self, name: str, workers: int, queue_limit: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix=f"{name}-pool"
+        )
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_limit)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Schedule fn on the pool, or raise PoolFullError if it is saturated."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolFullError(f"The {self.name} pool is busy, try again shortly.")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Await fn on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            rejected = self.rejected
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.workers),
+            "rejected": rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+
+cpu_pool = BoundedPool(
+    "cpu",
+    workers=int(os.getenv("CPU_POOL_WORKERS", "2")),
+    queue_limit=int(os.getenv("CPU_POOL_QUEUE", "16")),
+)
+io_pool = BoundedPool(
+    "io",
+    workers=int(os.getenv("IO_POOL_WORKERS", "8")),
+    queue_limit=int(os.getenv("IO_POOL_QUEUE", "64")),
+)
+
+
+def pool_stats() -> dict:
+    return {pool.name: pool.stats() for pool in (cpu_pool, io_pool)}
+
+
+def shutdown_pools():
+    for pool in (cpu_pool, io_pool):
+        pool.shutdown(wait=False)
@@ -0,0 +1,171 @@
+# app/utils/extract_cache.py
+"""
+Content-addressed cache for extracted document text.
+Entries are keyed by file content hash plus extractor version and kept in an
+in-memory LRU (bounded by bytes) backed by plain-text files on disk.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from app.utils.helpers import extract_text, EXTRACTOR_VERSION
+
+CACHE_DIR = os.getenv("EXTRACT_CACHE_DIR", "extract_cache")
+MEMORY_LIMIT_BYTES = int(os.getenv("EXTRACT_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of a file's content, read in fixed-size blocks."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = MEMORY_LIMIT_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (text, size in bytes)
+        self._memory_bytes = 0
+        self._digests = {}  # abs path -> (mtime_ns, size, digest)
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    def file_digest(self, file_path: str) -> str:
+        """
+        Content hash of a file, recomputed only when its size or mtime changes.
+        A changed file drops the entries cached for its previous content.
+        """
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        with self._lock:
+            known = self._digests.get(path)
+        if known and known[:2] == (st.st_mtime_ns, st.st_size):
+            return known[2]
+
+        digest = hash_file(path)
+        with self._lock:
+            self._digests[path] = (st.st_mtime_ns, st.st_size, digest)
+            stale = known[2] if known and known[2] != digest else None
+            if stale and all(d[2] != stale for d in self._digests.values()):
+                self._drop(self._key(stale))
+        return digest
+
+    def extract(self, file_path: str) -> dict:
+        """Same contract as helpers.extract_text, served from cache when possible."""
+        try:
+            key = self._key(self.file_digest(file_path))
+        except OSError as e:
+            return {"text": "", "error": str(e)}
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return {"text": entry[0], "error": None}
+
+        text = self._read_disk(key)
+        if text is not None:
+            with self._lock:
+                self.hits["disk"] += 1
+            self._remember(key, text)
+            return {"text": text, "error": None}
+
+        with self._lock:
+            self.misses += 1
+        result = extract_text(file_path)
+        if not result["error"]:
+            self._write_disk(key, result["text"])
+            self._remember(key, result["text"])
+        return result
+
+    def invalidate(self, file_path: str):
+        """Forget a path, e.g. after a file in uploaded_docs has been replaced."""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            known = self._digests.pop(path, None)
+            if known and all(d[2] != known[2] for d in self._digests.values()):
+                self._drop(self._key(known[2]))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_limit_bytes": self.max_bytes,
+            }
+
+    @staticmethod
+    def _key(digest: str) -> str:
+        return f"{digest}-v{EXTRACTOR_VERSION}"
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".txt")
+
+    def _read_disk(self, key: str):
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return str(mm[:], "utf-8")
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, text: str):
+        path = self._disk_path(key)
+        tmp_path = None
+        try:
+            # Unique across processes too (prefork and job workers share the dir)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _remember(self, key: str, text: str):
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = (text, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted
+
+    def _drop(self, key: str):
+        # Caller holds the lock
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+
+extraction_cache = ExtractionCache()
+
+
+def cached_extract_text(file_path: str) -> dict:
+    return extraction_cache.extract(file_path)
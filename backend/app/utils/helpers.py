@@ -1,42 +1,238 @@
 # app/utils/helpers.py
-from typing import List
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Tuple
 import re
 import os
-import time
 import tempfile
 from fastapi import UploadFile
-import os
 from PyPDF2 import PdfReader
 from docx import Document
+from app.utils.pdf_extract import iter_pdf_pages, PDF_EXTRACTOR
 
 
-def chunk_text(text: str, max_chars: int = 1000) -> List[str]:
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Clause punctuation followed by a space: the preferred cut in a long sentence
+CLAUSE_BREAK = re.compile(r"[,;:)]\s")
+
+
+def iter_sentence_spans(texts: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
     """
-    Split long text into chunks of ~max_chars.
-    Tries to split on sentences (periods) if possible.
+    Split a stream of text blocks into sentences.
+    Yields (start, end, sentence) with offsets into "\n".join(texts), i.e. the
+    text extract_text returns. The trailing partial sentence of each block is
+    carried into the next one, so sentences spanning a page break come out whole.
+    """
+    pending = ""
+    pending_start = 0
+    block_start = 0
+    for text in texts:
+        if pending:
+            buffer = pending + "\n" + text
+            buffer_start = pending_start
+        else:
+            buffer = text
+            buffer_start = block_start
+        pos = 0
+        for m in SENTENCE_SPLIT.finditer(buffer):
+            yield buffer_start + pos, buffer_start + m.start(), buffer[pos : m.start()]
+            pos = m.end()
+        pending = buffer[pos:]
+        pending_start = buffer_start + pos
+        block_start += len(text) + 1
+    if pending:
+        yield pending_start, pending_start + len(pending), pending
+
+
+def iter_sentences(texts: Iterable[str]) -> Iterator[str]:
+    """Split a stream of text blocks into sentences (see iter_sentence_spans)."""
+    for _, _, sentence in iter_sentence_spans(texts):
+        yield sentence
+
+
+def _split_at_words(sentence: str, max_chars: int) -> List[str]:
     """
-    import re
+    Cut a sentence into pieces of at most max_chars, after clause punctuation
+    in the second half of a piece if there is any, else at the last space; a
+    word is only split if it is longer than max_chars on its own.
+    """
+    pieces = []
+    sentence = sentence.strip()
+    while len(sentence) > max_chars:
+        cut = -1
+        for m in CLAUSE_BREAK.finditer(sentence, max_chars // 2, max_chars + 1):
+            cut = m.end() - 1
+        if cut <= 0:
+            cut = sentence.rfind(" ", 1, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].rstrip())
+        sentence = sentence[cut:].lstrip()
+    pieces.append(sentence)
+    return pieces
+
 
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    chunks = []
-    current_chunk = ""
+def iter_chunks(texts: Iterable[str], max_chars: int = 1000) -> Iterator[str]:
+    """
+    Streaming version of chunk_text: consume text blocks and yield chunks of
+    ~max_chars as soon as they are complete.
+    """
+    # Collect parts and join once per chunk instead of growing a string
+    parts = []
+    current_len = 0
 
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) + 1 <= max_chars:
-            current_chunk += " " + sentence if current_chunk else sentence
+    for sentence in iter_sentences(texts):
+        if current_len + len(sentence) + 1 <= max_chars:
+            if current_len:
+                parts.append(sentence)
+                current_len += len(sentence) + 1
+            else:
+                parts = [sentence]
+                current_len = len(sentence)
         else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            # If single sentence is longer than max_chars, split hard
-            while len(sentence) > max_chars:
-                chunks.append(sentence[:max_chars])
-                sentence = sentence[max_chars:]
-            current_chunk = sentence
+            if current_len:
+                yield " ".join(parts).strip()
+            # A sentence longer than max_chars is cut between words
+            if len(sentence) > max_chars:
+                *pieces, sentence = _split_at_words(sentence, max_chars)
+                yield from pieces
+            parts = [sentence]
+            current_len = len(sentence)
+
+    if current_len:
+        yield " ".join(parts).strip()
+
+
+def approx_token_count(text: str) -> int:
+    """Rough subword token count (~1.3 BPE tokens per English word)."""
+    return int(len(text.split()) * 1.3) + 1
+
+
+def _split_long_sentence(start, sentence, tokens, max_tokens, count_tokens):
+    # Cut at whitespace near the token budget so words are never split (unless
+    # a single word is over budget), re-measuring each piece until it fits
+    piece_chars = max(1, int(len(sentence) / tokens * max_tokens * 0.9))
+    i = 0
+    while i < len(sentence):
+        limit = min(len(sentence), i + piece_chars)
+        while True:
+            j = limit
+            if j < len(sentence):
+                k = sentence.rfind(" ", i + 1, j)
+                if k > i:
+                    j = k
+            piece = sentence[i:j].strip()
+            piece_tokens = count_tokens(piece)
+            if piece_tokens <= max_tokens or j - i <= 1:
+                break
+            limit = i + max(1, int((j - i) * max_tokens / piece_tokens * 0.9))
+        yield start + i, start + j, piece, piece_tokens
+        i = j
+        while i < len(sentence) and sentence[i].isspace():
+            i += 1
+
+
+def iter_token_chunks(
+    texts: Iterable[str],
+    count_tokens: Callable[[str], int] = None,
+    max_tokens: int = 900,
+    overlap_tokens: int = 0,
+) -> Iterator[dict]:
+    """
+    Pack whole sentences from a stream of text blocks into chunks of at most
+    max_tokens, as measured by count_tokens (e.g. the model tokenizer).
+    Consecutive chunks share up to overlap_tokens of trailing sentences; the
+    joined chunk is re-measured, and overlap is dropped if it no longer fits.
+    Yields dicts with keys:
+        - text: str
+        - start / end: int offsets into "\n".join(texts)
+        - tokens: int
+    """
+    count_tokens = count_tokens or approx_token_count
+    window = deque()  # (start, end, text, tokens)
+    window_tokens = 0
+    fresh = False  # window holds sentences not yet emitted
+    carried = 0  # leading pieces already emitted with the previous chunk
+
+    def emit():
+        nonlocal window_tokens, carried
+        text = " ".join(piece[2] for piece in window)
+        tokens = count_tokens(text)
+        # Joining can tokenize differently than the pieces did
+        while tokens > max_tokens and carried:
+            window_tokens -= window.popleft()[3]
+            carried -= 1
+            text = " ".join(piece[2] for piece in window)
+            tokens = count_tokens(text)
+        carried = len(window)
+        return {
+            "text": text,
+            "start": window[0][0],
+            "end": window[-1][1],
+            "tokens": tokens,
+        }
+
+    for start, end, sentence in iter_sentence_spans(texts):
+        text = sentence.strip()
+        if not text:
+            continue
+        tokens = count_tokens(text)
+        if tokens > max_tokens:
+            pieces = _split_long_sentence(
+                start, sentence, tokens, max_tokens, count_tokens
+            )
+        else:
+            pieces = [(start, end, text, tokens)]
+
+        for piece in pieces:
+            if window and window_tokens + piece[3] > max_tokens:
+                if fresh:
+                    yield emit()
+                    fresh = False
+                # Keep only the overlap that still leaves room for this piece
+                while window and (
+                    window_tokens > overlap_tokens
+                    or window_tokens + piece[3] > max_tokens
+                ):
+                    window_tokens -= window.popleft()[3]
+                    carried = max(0, carried - 1)
+            window.append(piece)
+            window_tokens += piece[3]
+            fresh = True
+
+    if fresh:
+        yield emit()
 
-    if current_chunk:
-        chunks.append(current_chunk.strip())
 
-    return chunks
+def chunk_text(text: str, max_chars: int = 1000) -> List[str]:
+    """
+    Split long text into chunks of ~max_chars.
+    Tries to split on sentences (periods) if possible.
+    """
+    return list(iter_chunks([text], max_chars=max_chars))
+
+
+def bucket_by_length(
+    lengths: List[int], batch_size: int = 8, max_pad_ratio: float = 1.5
+) -> List[List[int]]:
+    """
+    Group item indices into length-sorted batches for padded batch inference.
+    A batch is closed when it is full or when its longest item would be more
+    than max_pad_ratio times its shortest, so little compute goes to padding.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current = []
+    for i in order:
+        if current and (
+            len(current) >= batch_size
+            or lengths[i] > max_pad_ratio * max(1, lengths[current[0]])
+        ):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
 
 
 def clean_text(text: str) -> str:
@@ -48,23 +244,79 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+def iter_clean_text(texts: Iterable[str]) -> Iterator[str]:
+    """Apply clean_text to each block of a stream, skipping empty blocks."""
+    for text in texts:
+        cleaned = clean_text(text)
+        if cleaned:
+            yield cleaned
+
+
 AUDIO_DIR = "temp_audio"
 
+# Bump whenever extract_text output changes so cached extractions are rebuilt;
+# the PDF extractor is part of it since pypdf2 and pdfplumber text differ
+EXTRACTOR_VERSION = f"3-{PDF_EXTRACTOR}"
+
+# Target size of the blocks yielded for TXT and DOCX files
+TEXT_BLOCK_CHARS = 64 * 1024
+
+# Uploads are streamed to disk in fixed-size chunks and capped in size
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("UPLOAD_MAX_MB", "50")) * 1024 * 1024
+ALLOWED_EXTENSIONS = (".txt", ".pdf", ".docx")
+
+
+def _group_lines(lines: Iterable[str], block_chars: int) -> Iterator[str]:
+    block = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= block_chars:
+            yield "\n".join(block)
+            block = []
+            size = 0
+    if block:
+        yield "\n".join(block)
+
 
-def cleanup_temp(ttl: int = 3600):
+def iter_text_blocks(file_path: str) -> Iterator[dict]:
     """
-    Delete files older than TTL seconds from AUDIO_DIR
+    Lazily extract text from TXT, PDF, or DOCX.
+    Yields dicts with keys:
+        - page: int (1-based PDF page, or block number for TXT/DOCX)
+        - text: str
+    Raises on unreadable or unsupported files.
     """
-    while True:
-        now = time.time()
-        for f in os.listdir(AUDIO_DIR):
-            path = os.path.join(AUDIO_DIR, f)
-            if os.path.isfile(path) and now - os.path.getmtime(path) > ttl:
-                try:
-                    os.remove(path)
-                except Exception:
-                    pass
-        time.sleep(600)  # run every 10 minutes
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext == ".txt":
+        with open(file_path, "r", encoding="utf-8") as f:
+            lines = (line.rstrip("\n") for line in f)
+            for page, text in enumerate(_group_lines(lines, TEXT_BLOCK_CHARS), 1):
+                yield {"page": page, "text": text}
+
+    elif ext == ".pdf":
+        # Large PDFs are extracted by a process pool, merged in page order
+        for page, text in enumerate(iter_pdf_pages(file_path), 1):
+            yield {"page": page, "text": text}
+
+    elif ext == ".docx":
+        doc = Document(file_path)
+        paragraphs = (p.text for p in doc.paragraphs)
+        for page, text in enumerate(_group_lines(paragraphs, TEXT_BLOCK_CHARS), 1):
+            yield {"page": page, "text": text}
+
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+
+def count_pages(file_path: str):
+    """Page count for PDFs (read from the page tree, no text extraction), else None."""
+    if os.path.splitext(file_path)[1].lower() != ".pdf":
+        return None
+    return len(PdfReader(file_path).pages)
 
 
 def extract_text(file_path: str) -> dict:
@@ -74,27 +326,9 @@ def extract_text(file_path: str) -> dict:
         - text: str
         - error: str | None
     """
-    ext = os.path.splitext(file_path)[1].lower()
-
     try:
-        if ext == ".txt":
-            with open(file_path, "r", encoding="utf-8") as f:
-                return {"text": f.read(), "error": None}
-
-        elif ext == ".pdf":
-            reader = PdfReader(file_path)
-            text = []
-            for page in reader.pages:
-                text.append(page.extract_text() or "")
-            return {"text": "\n".join(text), "error": None}
-
-        elif ext == ".docx":
-            doc = Document(file_path)
-            return {"text": "\n".join([p.text for p in doc.paragraphs]), "error": None}
-
-        else:
-            return {"text": "", "error": f"Unsupported file type: {ext}"}
-
+        blocks = iter_text_blocks(file_path)
+        return {"text": "\n".join(block["text"] for block in blocks), "error": None}
     except Exception as e:
         return {"text": "", "error": str(e)}
 
@@ -104,10 +338,19 @@ def save_and_extract(file: UploadFile) -> dict:
     Save uploaded file temporarily and extract text.
     Returns dict with 'text' and 'error'.
     """
+    tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file.filename) as tmp:
-            tmp.write(file.file.read())
+        suffix = os.path.splitext(os.path.basename(file.filename or ""))[1]
+        if suffix.lower() not in ALLOWED_EXTENSIONS:
+            return {"text": "", "error": f"Unsupported file type: {suffix}"}
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
             tmp_path = tmp.name
+            size = 0
+            for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_BYTES), b""):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    return {"text": "", "error": "Uploaded file is too large."}
+                tmp.write(chunk)
 
         result = extract_text(tmp_path)  # dict
         if result["error"]:
@@ -121,3 +364,6 @@ def save_and_extract(file: UploadFile) -> dict:
 
     except Exception as e:
         return {"text": "", "error": f"Failed to extract text: {str(e)}"}
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,9 +1,17 @@
 # app/utils/intent_detector.py
+import hashlib
+import os
+from functools import lru_cache
 from typing import List
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sentence_transformers import SentenceTransformer
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.model_registry import model_registry
 
-# Lightweight CPU model
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# Lightweight CPU model, loaded on first use through the model registry
+MODEL_NAME = "all-MiniLM-L6-v2"
+model_registry.register("intent_encoder", lambda: SentenceTransformer(MODEL_NAME))
 
 # Expanded semantic templates for tasks
 TASKS = {
@@ -55,20 +63,120 @@ TASKS = {
 }
 
 SIM_THRESHOLD = 0.55  # similarity threshold
+PROMPT_CACHE_SIZE = int(os.getenv("INTENT_PROMPT_CACHE_SIZE", "1024"))
+EMBEDDING_CACHE_DIR = os.getenv("INTENT_EMBEDDING_CACHE_DIR", "model_cache")
+BATCH_MAX_SIZE = int(os.getenv("INTENT_BATCH_MAX_SIZE", "32"))
+BATCH_WINDOW_MS = float(os.getenv("INTENT_BATCH_WINDOW_MS", "5"))
+
+
+def _templates_digest() -> str:
+    """Fingerprint of the model name and templates, so stale sidecars are ignored."""
+    h = hashlib.sha256(MODEL_NAME.encode("utf-8"))
+    for task, examples in TASKS.items():
+        h.update(task.encode("utf-8"))
+        for example in examples:
+            h.update(b"\0" + example.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _load_template_index():
+    """
+    Embed every template once into a row-normalized matrix.
+    The matrix is reused from an on-disk .npy sidecar when one matches TASKS.
+    Returns (matrix, spans) where spans maps task -> (start, end) row range.
+    """
+    spans = {}
+    examples = []
+    for task, task_examples in TASKS.items():
+        spans[task] = (len(examples), len(examples) + len(task_examples))
+        examples.extend(task_examples)
+
+    sidecar = os.path.join(
+        EMBEDDING_CACHE_DIR, f"intent_templates_{_templates_digest()}.npy"
+    )
+    if os.path.exists(sidecar):
+        try:
+            matrix = np.load(sidecar)
+            if matrix.shape[0] == len(examples):
+                return matrix, spans
+        except Exception:
+            pass
+
+    matrix = model_registry.get("intent_encoder").encode(
+        examples, convert_to_numpy=True, normalize_embeddings=True
+    ).astype(np.float32)
+    try:
+        os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+        np.save(sidecar, matrix)
+    except OSError:
+        pass
+    return matrix, spans
+
+
+model_registry.register("intent_templates", _load_template_index)
+
+
+def _encode_batch(prompts: List[str]) -> np.ndarray:
+    embeddings = model_registry.get("intent_encoder").encode(
+        prompts,
+        batch_size=len(prompts),
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    ).astype(np.float32)
+    embeddings.flags.writeable = False  # rows are shared by every cache hit
+    return embeddings
+
+
+# Concurrent requests that miss the cache are encoded together
+prompt_batcher = MicroBatcher(
+    _encode_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_WINDOW_MS,
+    name="intent-encoder",
+)
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _embed_prompt(user_prompt: str) -> np.ndarray:
+    return prompt_batcher.encode(user_prompt)
+
+
+def embed_prompt(user_prompt: str) -> np.ndarray:
+    """Normalized (cached, micro-batched) embedding of a prompt."""
+    return _embed_prompt(user_prompt)
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Normalized embeddings for a batch of passages, e.g. document chunks."""
+    return model_registry.get("intent_encoder").encode(
+        texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True
+    ).astype(np.float32)
+
+
+def _semantic_intents(user_prompt: str) -> List[str]:
+    # Both sides are normalized, so one matrix-vector product gives cosine scores
+    template_matrix, template_spans = model_registry.get("intent_templates")
+    scores = template_matrix @ _embed_prompt(user_prompt)
+    return [
+        task
+        for task, (start, end) in template_spans.items()
+        if scores[start:end].max() >= SIM_THRESHOLD
+    ]
 
 
 def detect_intent(user_prompt: str, return_constraints=False) -> List[str]:
     """
     Detect tasks from a natural prompt: summarize, translate, tts
     """
-    intents = []
-    prompt_embedding = model.encode(user_prompt, convert_to_tensor=True)
+    intents, constraints = _detect_intent_cached(user_prompt)
+    if return_constraints:
+        return list(intents), dict(constraints)
+    return list(intents)
 
-    for task, examples in TASKS.items():
-        example_embeddings = model.encode(examples, convert_to_tensor=True)
-        cosine_scores = util.cos_sim(prompt_embedding, example_embeddings)
-        if cosine_scores.max().item() >= SIM_THRESHOLD:
-            intents.append(task)
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _detect_intent_cached(user_prompt: str):
+    intents = _semantic_intents(user_prompt)
 
     # Fallback: keyword-based detection for each intent
     prompt_lower = user_prompt.lower()
@@ -163,6 +271,21 @@ def detect_intent(user_prompt: str, return_constraints=False) -> List[str]:
             if lang in ["hindi", "telugu", "english"]:
                 constraints["target_lang"] = lang
             break
-    if return_constraints:
-        return intents, constraints
-    return intents
+    return tuple(intents), constraints
+
+
+async def detect_intent_async(user_prompt: str, return_constraints=False):
+    """
+    Same as detect_intent, but waits for the encoder batch off the event loop
+    so concurrent requests can share one forward pass.
+    """
+    return await run_in_threadpool(detect_intent, user_prompt, return_constraints)
+
+
+def intent_cache_info() -> dict:
+    """Hit/miss counters for the prompt embedding and intent result caches."""
+    return {
+        "embeddings": _embed_prompt.cache_info()._asdict(),
+        "intents": _detect_intent_cached.cache_info()._asdict(),
+        "batcher": prompt_batcher.metrics(),
+    }
@@ -0,0 +1,143 @@
+# app/utils/job_queue.py
+"""
+Durable SQLite-backed queue for long-running document jobs.
+The API process submits and polls jobs; worker processes claim and run them.
+"""
+
+import json
+import os
+import time
+import uuid
+from app.utils.sqlite_store import SQLiteStore, row_to_dict
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.db")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stages TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobStore(SQLiteStore):
+    TABLE = "jobs"
+    KEY = "id"
+    SCHEMA = _SCHEMA
+
+    def __init__(self, db_path: str = JOB_DB_PATH):
+        super().__init__(db_path)
+
+    def submit(self, file_path: str, prompt: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, file_path, prompt, status, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, file_path, prompt, QUEUED, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def claim(self, worker: str):
+        """Atomically move the oldest queued job to running and return it."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, updated_at = ?"
+                        " WHERE id = ?",
+                        (RUNNING, worker, time.time(), row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = _row_to_dict(row)
+        job["status"] = RUNNING
+        return job
+
+    def update_stages(self, job_id: str, stages: dict):
+        self._update(job_id, stages=json.dumps(stages))
+
+    def finish(self, job_id: str, result: dict, stages: dict):
+        self._update(
+            job_id, status=SUCCEEDED, result=json.dumps(result), stages=json.dumps(stages)
+        )
+
+    def fail(self, job_id: str, error: str, stages: dict, status: str = FAILED):
+        self._update(job_id, status=status, error=error, stages=json.dumps(stages))
+
+    def request_cancel(self, job_id: str):
+        """
+        Cancel a job. Queued jobs are cancelled immediately; running jobs stop
+        at the next stage boundary. Returns the job's status afterwards.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, now, job_id, QUEUED),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ?"
+                " WHERE id = ? AND status = ?",
+                (now, job_id, RUNNING),
+            )
+        job = self.get(job_id)
+        return job["status"] if job else None
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def requeue_stale(self, older_than: float):
+        """
+        Put running jobs that have not progressed for older_than seconds back
+        on the queue, e.g. after their worker process died.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, updated_at = ?"
+                " WHERE status = ? AND updated_at < ?",
+                (QUEUED, now, RUNNING, now - older_than),
+            )
+
+
+def _row_to_dict(row) -> dict:
+    return row_to_dict(
+        row, flags=("cancel_requested",), json_fields=("stages", "result")
+    )
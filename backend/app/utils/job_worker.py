@@ -0,0 +1,147 @@
+# app/utils/job_worker.py
+"""
+Worker processes that drain the job queue using the existing agents.
+Run standalone with: python -m app.utils.job_worker --workers 2
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+from app.utils.job_queue import JobStore, CANCELLED
+
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "3600"))
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def run_job(store: JobStore, job: dict):
+    # Agents and models are imported lazily so only worker processes load them
+    from app.utils.intent_detector import detect_intent
+    from app.utils.extract_cache import extraction_cache, cached_extract_text
+    from app.utils.process_doc import planned_stages, stage_cache_keys
+    from app.utils.process_doc import cached_stage_output
+    from app.utils.result_cache import result_cache
+
+    job_id = job["id"]
+    stages = {}
+
+    def start(name):
+        if store.is_cancel_requested(job_id):
+            raise JobCancelled()
+        stages[name] = {"status": "running", "started_at": time.time()}
+        store.update_stages(job_id, stages)
+
+    def done(name):
+        stage = stages[name]
+        stage["status"] = "done"
+        stage["seconds"] = round(time.time() - stage.pop("started_at"), 3)
+        store.update_stages(job_id, stages)
+
+    try:
+        intents, constraints = detect_intent(job["prompt"], return_constraints=True)
+        stages_to_run = planned_stages(intents)
+        stages["extract"] = {"status": "pending"}
+        for name, _, _ in stages_to_run:
+            stages[name] = {"status": "pending"}
+
+        start("extract")
+        extract_result = cached_extract_text(job["file_path"])
+        if extract_result["error"]:
+            stages["extract"]["status"] = "failed"
+            store.fail(job_id, extract_result["error"], stages)
+            return
+        done("extract")
+
+        results = {}
+        processed_content = extract_result["text"].strip()
+        doc_hash = extraction_cache.file_digest(job["file_path"])
+        keys = stage_cache_keys(doc_hash, stages_to_run, constraints)
+        for (name, result_key, stage), key in zip(stages_to_run, keys):
+            start(name)
+            output = cached_stage_output(key, name)
+            if output is None:
+                output = stage(processed_content, constraints)
+                if output is None:
+                    stages[name]["status"] = "failed"
+                    store.fail(job_id, f"The {name} stage failed", stages)
+                    return
+                result_cache.put(key, output)
+            else:
+                stages[name]["cached"] = True
+            processed_content = output
+            results[result_key] = output
+            done(name)
+        store.finish(job_id, {"intents": intents, "results": results}, stages)
+    except JobCancelled:
+        store.fail(job_id, "Cancelled by user", stages, status=CANCELLED)
+    except Exception as e:
+        store.fail(job_id, str(e), stages)
+
+
+def worker_loop(worker_name: str, poll_interval: float = POLL_INTERVAL):
+    store = JobStore()
+    while True:
+        job = None
+        try:
+            job = store.claim(worker_name)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            run_job(store, job)
+        except Exception as e:
+            # One bad job or a locked database must not take the worker down
+            traceback.print_exc()
+            if job is not None:
+                try:
+                    store.fail(job["id"], str(e), job["stages"])
+                except Exception:
+                    traceback.print_exc()
+            time.sleep(poll_interval)
+
+
+def start_workers(count: int) -> list:
+    """Spawn worker processes; jobs stuck running on dead workers are requeued."""
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    JobStore().requeue_stale(STALE_SECONDS)
+    # spawn, so each worker gets a clean interpreter for torch
+    ctx = multiprocessing.get_context("spawn")
+    workers = []
+    for i in range(count):
+        process = ctx.Process(
+            target=worker_loop, args=(f"{prefix}-{i}",), daemon=True
+        )
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def stop_workers(workers: list):
+    for process in workers:
+        process.terminate()
+    for process in workers:
+        process.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Docability job workers.")
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("JOB_WORKERS", "1") or 1)
+    )
+    args = parser.parse_args()
+    workers = start_workers(args.workers)
+    print(f"Started {len(workers)} job worker(s)")
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        stop_workers(workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+# app/utils/metrics.py
+"""
+In-process metrics in the Prometheus text exposition format.
+- Counter / Gauge / Histogram families with labels, updated on the hot path
+- collectors: callbacks that report existing stats (pools, caches) at scrape
+- RequestTimings: per-request stage timer feeding the stage histograms, with
+  an optional cProfile dump of the work done for the request
+- prefork workers (startup.py) write snapshots to METRICS_DIR; a scrape merges
+  them, summing counters and histograms and labelling gauges with the pid
+"""
+
+import cProfile
+import functools
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from app.utils.env_vars import PREFORK_WORKER
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")  # empty disables per-request profiles
+METRICS_DIR = "METRICS_DIR"  # env var, set by startup.py for prefork workers
+SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "5"))
+ARCHIVE_FILE = "archive.json"  # counters of workers that have exited
+
+# Seconds, from a cached intent lookup up to a long BART summarization
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300
+)
+# Characters of input text, roughly a sentence up to a few hundred pages
+SIZE_BUCKETS = (100, 1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple, value) -> list:
+        labels = _format_labels(self.label_names, key)
+        return [f"{self.name}{labels} {_format_value(value)}"]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {
+            "name": self.name,
+            "type": self.type,
+            "help": self.help,
+            "labels": list(self.label_names),
+            "samples": samples,
+        }
+
+    def _merge(self, key: tuple, value):
+        """Add another process's sample into this one."""
+        self._values[key] = self._values.get(key, 0) + value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: tuple = (), buckets=LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [per-bucket counts (non-cumulative), sum, count]
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def _render_sample(self, key: tuple, value) -> list:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        # Buckets are cumulative; the +Inf bucket holds every observation
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts + [0]):
+            cumulative = count if bound == float("inf") else cumulative + bucket_count
+            le = f'le="{_format_value(float(bound))}"'
+            labels = _format_labels(self.label_names, key, le)
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+    def _merge(self, key: tuple, value):
+        counts, total, count = value
+        entry = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+        entry[0] = [a + b for a, b in zip(entry[0], counts)]
+        entry[1] += total
+        entry[2] += count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: tuple = (), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def register_collector(self, collect):
+        """
+        collect() is called on every scrape and returns fresh metrics to
+        render, e.g. gauges filled from an existing stats() dict.
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def collect(self) -> list:
+        """Registered metrics plus whatever the collectors report right now."""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        for collect in collectors:
+            try:
+                metrics.extend(collect())
+            except Exception:
+                continue  # a broken collector must not take down the endpoint
+        return metrics
+
+    def render(self) -> str:
+        """This process's metrics, or every prefork worker's merged together."""
+        directory = os.getenv(METRICS_DIR) if os.getenv(PREFORK_WORKER) else None
+        if directory:
+            write_snapshot(directory)
+            return _render_metrics(_merge_snapshots(_read_snapshots(directory)))
+        return _render_metrics(self.collect())
+
+    def _add(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+
+def _render_metrics(metrics: list) -> str:
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# -----------------------------
+# Prefork: one snapshot file per worker, merged at scrape time
+# -----------------------------
+def _write_json(path: str, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(directory: str):
+    """Write this process's metrics to <directory>/<pid>.json."""
+    snapshot = {
+        "pid": os.getpid(),
+        "metrics": [metric.snapshot() for metric in registry.collect()],
+    }
+    _write_json(os.path.join(directory, f"{os.getpid()}.json"), snapshot)
+
+
+def snapshot_forever(directory: str, interval: float = SNAPSHOT_INTERVAL):
+    while True:
+        time.sleep(interval)
+        write_snapshot(directory)
+
+
+def _read_snapshots(directory: str) -> list:
+    archive = _read_json(os.path.join(directory, ARCHIVE_FILE))
+    snapshots = [archive] if archive else []
+    # Files of workers already folded into the archive may not be removed yet
+    archived = set(archive["archived"]) if archive else set()
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        name = os.path.basename(path)
+        if name == ARCHIVE_FILE or name[: -len(".json")] in archived:
+            continue
+        snapshot = _read_json(path)
+        if snapshot is not None:
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def _merge_snapshots(snapshots: list) -> list:
+    """
+    Counters and histograms are summed over processes; gauges describe one
+    process each, so they get a pid label instead.
+    """
+    merged = {}
+    for snapshot in snapshots:
+        pid = snapshot.get("pid")
+        for data in snapshot["metrics"]:
+            is_gauge = data["type"] == Gauge.type
+            metric = merged.get(data["name"])
+            if metric is None:
+                labels = tuple(data["labels"]) + (("pid",) if is_gauge else ())
+                if data["type"] == Histogram.type:
+                    metric = Histogram(
+                        data["name"], data["help"], labels, data["buckets"]
+                    )
+                else:
+                    cls = Gauge if is_gauge else Counter
+                    metric = cls(data["name"], data["help"], labels)
+                merged[data["name"]] = metric
+            for key, value in data["samples"]:
+                key = tuple(key) + ((str(pid),) if is_gauge else ())
+                metric._merge(key, value)
+    return list(merged.values())
+
+
+def archive_snapshot(directory: str, pid: int):
+    """
+    Fold an exited worker's counters and histograms into the archive file so
+    totals survive worker recycling; its gauges are dropped. Called by the
+    prefork parent, the only writer of the archive.
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    snapshot = _read_json(path)
+    if snapshot is None:
+        return
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    previous = _read_json(archive_path) or {"metrics": [], "archived": []}
+    kept = [data for data in snapshot["metrics"] if data["type"] != Gauge.type]
+    merged = _merge_snapshots([previous, {"pid": pid, "metrics": kept}])
+    # Readers skip the archived pids' files, so nothing is counted twice
+    # between writing the archive and removing the worker's file
+    _write_json(
+        archive_path,
+        {
+            "pid": None,
+            "metrics": [metric.snapshot() for metric in merged],
+            "archived": (previous["archived"] + [str(pid)])[-64:],
+        },
+    )
+    os.remove(path)
+
+STAGE_SECONDS = registry.histogram(
+    "docability_stage_seconds",
+    "Wall time per pipeline stage, including pool queue wait.",
+    ("stage",),
+)
+STAGE_INPUT_CHARS = registry.histogram(
+    "docability_stage_input_chars",
+    "Characters of text entering each pipeline stage.",
+    ("stage",),
+    SIZE_BUCKETS,
+)
+STAGE_ERRORS = registry.counter(
+    "docability_stage_errors_total", "Pipeline stages that failed.", ("stage",)
+)
+AGENT_SECONDS = registry.histogram(
+    "docability_agent_run_seconds", "Duration of AgentBase.run calls.", ("agent",)
+)
+AGENT_ERRORS = registry.counter(
+    "docability_agent_errors_total",
+    "AgentBase.run calls that raised or returned an error.",
+    ("agent",),
+)
+REQUESTS = registry.counter(
+    "docability_requests_total",
+    "Handled requests by route and outcome.",
+    ("route", "outcome"),
+)
+
+
+def count_error(stage: str):
+    STAGE_ERRORS.inc(stage=stage)
+
+
+class RequestTimings:
+    """
+    Times the stages of one request into the stage histograms and keeps the
+    per-request breakdown. With profile=True (and PROFILE_DIR set) the work
+    passed through wrap() is profiled and dump() writes a .prof file.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()  # stages may be timed from pool threads
+        self._profiler = cProfile.Profile() if profile and PROFILE_DIR else None
+
+    @contextmanager
+    def stage(self, name: str, size: int = None):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            count_error(name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            STAGE_SECONDS.observe(elapsed, stage=name)
+            if size is not None:
+                STAGE_INPUT_CHARS.observe(size, stage=name)
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def wrap(self, fn):
+        """fn, profiled when this request is profiled (calls must not overlap)."""
+        if self._profiler is None:
+            return fn
+        return lambda *args, **kwargs: self._profiler.runcall(fn, *args, **kwargs)
+
+    def as_dict(self) -> dict:
+        """Milliseconds per stage plus the total so far."""
+        with self._lock:
+            stages = dict(self.stages)
+        timings = {name: round(seconds * 1000, 2) for name, seconds in stages.items()}
+        timings["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return timings
+
+    def dump(self):
+        """Write the collected profile; returns its path, or None if not profiling."""
+        if self._profiler is None:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof"
+        path = os.path.join(PROFILE_DIR, filename)
+        self._profiler.dump_stats(path)
+        return path
+
+
+def instrument_agent_run(agent_name: str, run):
+    """Wrap an agent's run() to record its duration and errors."""
+
+    @functools.wraps(run)
+    def timed_run(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            output = run(self, *args, **kwargs)
+        except Exception:
+            AGENT_ERRORS.inc(agent=agent_name)
+            raise
+        finally:
+            AGENT_SECONDS.observe(time.perf_counter() - start, agent=agent_name)
+        if isinstance(output, dict) and output.get("error"):
+            AGENT_ERRORS.inc(agent=agent_name)
+        return output
+
+    return timed_run
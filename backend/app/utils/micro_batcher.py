@@ -0,0 +1,107 @@
+# app/utils/micro_batcher.py
+"""
+Cross-request micro-batching for encoder models.
+Items submitted within a short window are encoded in one batched call.
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from queue import Queue, Empty
+from typing import Callable, List, Any
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        encode_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher",
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._items = 0
+        self._batches = 0
+        self._errors = 0
+        self._worker = None
+
+    def submit(self, item) -> Future:
+        """Queue an item for encoding; the future resolves to its result."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def encode(self, item):
+        """Blocking helper for callers that are not async."""
+        return self.submit(item).result()
+
+    def metrics(self) -> dict:
+        """Queue depth and batch-size distribution since start-up."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "queue_depth": self._queue.qsize(),
+                "items": self._items,
+                "batches": self._batches,
+                "errors": self._errors,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=f"{self.name}-worker", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self):
+        # Block for the first item, then keep collecting until the window
+        # closes or the batch is full.
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Drop callers that gave up before we got to them
+            batch = [
+                (item, future)
+                for item, future in batch
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            try:
+                results = self.encode_fn([item for item, _ in batch])
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._lock:
+                self._items += len(batch)
+                self._batches += 1
+                self._batch_sizes[len(batch)] += 1
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,116 @@
+# app/utils/model_registry.py
+"""
+Process-wide registry of heavy models.
+Each model is loaded once, lazily on first use (or eagerly via warmup),
+and shared by every agent in the process.
+"""
+
+import os
+import threading
+import time
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None if it cannot be measured."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader):
+        """Register a zero-argument loader; the first registration wins."""
+        with self._lock:
+            if name not in self._loaders:
+                self._loaders[name] = loader
+                self._locks[name] = threading.Lock()
+
+    def override(self, name: str, loader):
+        """Replace a loader (and drop any loaded instance), e.g. with a stub."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._models.pop(name, None)
+            self._stats.pop(name, None)
+
+    def get(self, name: str):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name not in self._models:
+                self._load(name)
+        return self._models[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warmup(self, names=None):
+        """Eagerly load the given models (all registered ones by default)."""
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def stats(self) -> dict:
+        return {
+            name: {"loaded": name in self._models, **self._stats.get(name, {})}
+            for name in self._loaders
+        }
+
+    def _load(self, name: str):
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        model = self._loaders[name]()
+        load_seconds = time.perf_counter() - started
+        rss_after = current_rss_bytes()
+        self._stats[name] = {
+            "load_seconds": round(load_seconds, 3),
+            "rss_delta_bytes": (
+                rss_after - rss_before
+                if rss_before is not None and rss_after is not None
+                else None
+            ),
+        }
+        self._models[name] = model
+
+
+model_registry = ModelRegistry()
+
+
+def warmup_targets() -> list:
+    """
+    Models named in WARMUP_MODELS ("all" or a comma-separated list).
+    Unknown names are ignored so the setting can be shared across deployments.
+    """
+    setting = os.getenv("WARMUP_MODELS", "").strip()
+    known = list(model_registry.stats())
+    if not setting:
+        return []
+    if setting.lower() in ("1", "true", "all"):
+        return known
+    names = [name.strip() for name in setting.split(",") if name.strip()]
+    return [name for name in names if name in known]
+
+
+def warmup_from_env():
+    """Warm the models listed in WARMUP_MODELS (see warmup_targets)."""
+    targets = warmup_targets()
+    if targets:
+        model_registry.warmup(targets)
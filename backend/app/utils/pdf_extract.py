@@ -0,0 +1,122 @@
+# app/utils/pdf_extract.py
+"""
+PDF page text extraction, optionally spread over a process pool.
+Large PDFs are split into contiguous page ranges; each worker opens the file
+itself and returns its pages, and results are merged back in page order.
+PDF_EXTRACTOR picks PyPDF2 (fast) or pdfplumber (better layout fidelity).
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PyPDF2 import PdfReader
+
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pypdf2")
+PDF_EXTRACTORS = ("pypdf2", "pdfplumber")
+# Below this many pages the pool's overhead outweighs the speedup
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+MIN_PAGES_PER_TASK = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pdf_workers() -> int:
+    """
+    Pool size: PDF_WORKERS, else all cores. Read when the pool starts, so the
+    share startup.py sets for each server and job worker process applies.
+    """
+    return int(os.getenv("PDF_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+
+
+def _extract_range(file_path: str, start: int, stop: int, extractor: str) -> list:
+    """Text of pages [start, stop) (0-based); runs inside a pool worker."""
+    if extractor == "pdfplumber":
+        import pdfplumber
+
+        pages = list(range(start + 1, stop + 1))
+        with pdfplumber.open(file_path, pages=pages) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages]
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _iter_plumber_pages(pdf):
+    for page in pdf.pages:
+        yield page.extract_text() or ""
+        # Drop parsed page objects as we go (not in every pdfplumber version)
+        if hasattr(page, "flush_cache"):
+            page.flush_cache()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, so workers do not inherit the server's threads and locks
+            _pool = ProcessPoolExecutor(
+                max_workers=pdf_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def page_ranges(page_count: int, workers: int = None) -> list:
+    """
+    Contiguous [start, stop) ranges, two per worker so a slow range
+    (scanned or image-heavy pages) does not hold up the whole document.
+    """
+    workers = workers or pdf_workers()
+    size = max(MIN_PAGES_PER_TASK, math.ceil(page_count / (workers * 2)))
+    return [
+        (start, min(start + size, page_count)) for start in range(0, page_count, size)
+    ]
+
+
+def iter_pdf_pages(
+    file_path: str,
+    extractor: str = PDF_EXTRACTOR,
+    min_pages: int = PARALLEL_MIN_PAGES,
+):
+    """Yield the text of each page in order; parallel above min_pages pages."""
+    if extractor not in PDF_EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor: {extractor}")
+    threshold = max(min_pages, 2 * MIN_PAGES_PER_TASK)
+    # The document opened for the page count is reused for sequential reads
+    if extractor == "pdfplumber":
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+            if pdf_workers() <= 1 or page_count < threshold:
+                yield from _iter_plumber_pages(pdf)
+                return
+    else:
+        reader = PdfReader(file_path)
+        page_count = len(reader.pages)
+        if pdf_workers() <= 1 or page_count < threshold:
+            for page in reader.pages:
+                yield page.extract_text() or ""
+            return
+        del reader  # the pool workers open the file themselves
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_range, file_path, start, stop, extractor)
+        for start, stop in page_ranges(page_count)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def shutdown_pdf_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
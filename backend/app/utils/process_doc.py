@@ -1,17 +1,114 @@
 # app/utils/process_doc.py
 import os
-from app.agents.summarizer.agent import SummarizerAgent
+from app.agents.summarizer.agent import SummarizerAgent, SUMMARY_MODE
 from app.agents.translator.agent import TranslatorAgent
 from app.agents.tts.agent import TTSAgent
-from app.utils.helpers import extract_text
+from typing import Iterator
+from app.utils.extract_cache import cached_extract_text
+from app.utils.helpers import iter_text_blocks
+from app.utils.result_cache import result_cache
+from app.utils.audio_store import audio_store
 from app.utils.constants import AgentTasks
+from app.utils.metrics import RequestTimings, REQUESTS
 
-# Instantiate agents once
+# Shared agent instances; models are loaded lazily through the model registry
 summarizer_agent = SummarizerAgent()
 translator_agent = TranslatorAgent()
 tts_agent = TTSAgent()
 
 
+def summarize_stage(content: str, constraints: dict):
+    """Summary text, or None if the model failed."""
+    # "focused" content is already narrowed to the relevant chunks
+    if constraints.get("summary_mode", SUMMARY_MODE) in ("hierarchical", "focused"):
+        return summarizer_agent.summarize_hierarchical(
+            content,
+            lines=constraints.get("lines"),
+            chars=constraints.get("chars"),
+            words=constraints.get("words"),
+        )
+    return summarizer_agent.summarize(
+        content,
+        lines=constraints.get("lines"),
+        chars=constraints.get("chars"),
+        words=constraints.get("words"),
+    )
+
+
+def translate_stage(content: str, constraints: dict):
+    """Translated text, or None on failure."""
+    target_lang = constraints.get("target_lang")
+    if target_lang:
+        return translator_agent.translate(content, target_lang=target_lang)
+    return translator_agent.translate(content)
+
+
+def tts_stage(content: str, constraints: dict):
+    """Audio URL under /audio for the narrated content, or None on failure."""
+    file_path = tts_agent.text_to_speech(content)
+    if file_path is None:
+        return None
+    return audio_store.url_for(os.path.basename(file_path))
+
+
+# Always process in the order: summarize, translate, tts/play
+# (stage name, triggering intents, result key, stage function)
+PIPELINE_STAGES = [
+    ("summarize", ("summarize",), "summary", summarize_stage),
+    ("translate", ("translate",), "translate", translate_stage),
+    ("tts", ("tts", "play"), "tts", tts_stage),
+]
+
+
+def planned_stages(intents: list) -> list:
+    """Pipeline stages triggered by the detected intents, in chain order."""
+    return [
+        (name, result_key, fn)
+        for name, triggers, result_key, fn in PIPELINE_STAGES
+        if any(intent in intents for intent in triggers)
+    ]
+
+
+def _stage_signature(name: str, constraints: dict) -> tuple:
+    """Everything besides the input text that changes a stage's output."""
+    if name == "summarize":
+        return (
+            name,
+            summarizer_agent.VERSION,
+            constraints.get("summary_mode", SUMMARY_MODE),
+            constraints.get("focus_query"),
+            constraints.get("lines"),
+            constraints.get("chars"),
+            constraints.get("words"),
+        )
+    if name == "translate":
+        return (name, translator_agent.VERSION, constraints.get("target_lang"))
+    return (name, tts_agent.VERSION)
+
+
+def stage_cache_keys(doc_hash: str, stages: list, constraints: dict) -> list:
+    """
+    Result cache key for each planned stage. A key covers the whole chain up to
+    that stage, so a cached summary can be reused by a prompt that only adds
+    translation on top of it.
+    """
+    keys = []
+    chain = (doc_hash,)
+    for name, _, _ in stages:
+        chain = chain + (_stage_signature(name, constraints),)
+        keys.append(chain)
+    return keys
+
+
+def cached_stage_output(key: tuple, name: str):
+    output = result_cache.get(key, stage=name)
+    # Audio files can be evicted underneath the cache
+    if name == "tts" and output is not None and not audio_store.has_url(output):
+        result_cache.discard(key)
+        return None
+    return output
+
+
 def process_document_from_path(file_path: str, task: str) -> dict:
     """
     Process a document from a local path with a given task:
@@ -19,6 +116,12 @@ def process_document_from_path(file_path: str, task: str) -> dict:
     - translate
     - tts
     """
+    result = _process_document(file_path, task, RequestTimings())
+    REQUESTS.inc(route="process_document", outcome="error" if result["error"] else "ok")
+    return result
+
+
+def _process_document(file_path: str, task: str, timer: RequestTimings) -> dict:
     if not os.path.exists(file_path):
         return {
             "task": task,
@@ -28,7 +131,8 @@ def process_document_from_path(file_path: str, task: str) -> dict:
         }
 
     # Extract text from file
-    result = extract_text(file_path)
+    with timer.stage("extract"):
+        result = cached_extract_text(file_path)
     if result["error"]:
         return {
             "task": task,
@@ -52,11 +156,14 @@ def process_document_from_path(file_path: str, task: str) -> dict:
         # Call the appropriate agent
         task_lower = task.lower()
         if task_lower == AgentTasks.SUMMARIZE:
-            output = summarizer_agent.run(text)
+            with timer.stage("summarize", input_length):
+                output = summarizer_agent.run(text)
         elif task_lower == AgentTasks.TRANSLATE:
-            output = translator_agent.run(text)
+            with timer.stage("translate", input_length):
+                output = translator_agent.run(text)
         elif task_lower == AgentTasks.TEXT_TO_SPEECH:
-            output = tts_agent.run(text)
+            with timer.stage("tts", input_length):
+                output = tts_agent.run(text)
         else:
             return {
                 "task": task,
@@ -78,3 +185,21 @@ def process_document_from_path(file_path: str, task: str) -> dict:
         "output": output,
         "error": None if not isinstance(output, dict) else output.get("error"),
     }
+
+
+def iter_process_document(file_path: str, task: str, **kwargs) -> Iterator[dict]:
+    """
+    Stream a document through an agent page by page.
+    Yields the agent's partial results as soon as each block is processed,
+    so memory stays bounded and output starts before extraction finishes.
+    """
+    agents = {
+        AgentTasks.SUMMARIZE: summarizer_agent,
+        AgentTasks.TRANSLATE: translator_agent,
+        AgentTasks.TEXT_TO_SPEECH: tts_agent,
+    }
+    agent = agents.get(task.lower())
+    if agent is None:
+        raise ValueError(f"Unsupported task '{task}'")
+    texts = (block["text"] for block in iter_text_blocks(file_path))
+    yield from agent.run_stream(texts, **kwargs)
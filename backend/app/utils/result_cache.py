@@ -0,0 +1,83 @@
+# app/utils/result_cache.py
+"""
+In-memory cache for pipeline stage outputs (summary, translation, audio path).
+Entries expire after a TTL and are evicted LRU-first past the size limits.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "512"))
+MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "64")) * 1024 * 1024
+TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+        ttl: float = TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def get(self, key: tuple, stage: str = "default"):
+        """Cached value for key, or None when missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < now:
+                if entry is not None:
+                    self._pop(key)
+                self.misses[stage] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits[stage] += 1
+            return entry[0]
+
+    def put(self, key: tuple, value):
+        if value is None:
+            return
+        size = len(str(value).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+
+    def discard(self, key: tuple):
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+            }
+
+    def _pop(self, key: tuple):
+        # Caller holds the lock
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+result_cache = ResultCache()
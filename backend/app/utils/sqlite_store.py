@@ -0,0 +1,55 @@
+# app/utils/sqlite_store.py
+"""
+Shared plumbing for the small SQLite stores (job queue, document catalog):
+WAL mode, short-lived autocommit connections, keyed updates and row
+conversion. Safe to use from several threads and processes at once.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+class SQLiteStore:
+    """Subclasses set the table, its key column and the schema script."""
+
+    TABLE = ""
+    KEY = ""
+    SCHEMA = ""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit connection, closed as soon as the caller is done
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _update(self, key: str, **fields):
+        """Set columns on one row; updated_at is always refreshed."""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE {self.TABLE} SET {assignments} WHERE {self.KEY} = ?",
+                (*fields.values(), key),
+            )
+
+
+def row_to_dict(row, flags: tuple = (), json_fields: tuple = ()) -> dict:
+    """Row as a dict, with integer flags as bools and JSON columns decoded."""
+    item = dict(row)
+    for field in flags:
+        item[field] = bool(item[field])
+    for field in json_fields:
+        item[field] = json.loads(item[field]) if item[field] else None
+    return item
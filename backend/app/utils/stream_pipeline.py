@@ -0,0 +1,300 @@
+# app/utils/stream_pipeline.py
+"""
+Pipelined summarize -> translate -> TTS over document chunks.
+Each stage runs in its own coordinator thread and hands chunks to the next
+through a bounded queue, so chunk i is translated and narrated while chunk
+i+1 is still being summarized, and a slow stage backs up the ones before it.
+Heavy work still goes through the shared pools (model calls on the cpu pool,
+translation and synthesis on their own bounded pools). Partial results are
+yielded as events in completion order.
+"""
+
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import wait
+from contextlib import closing
+from app.utils.executors import cpu_pool, io_pool, PoolFullError
+from app.utils.helpers import clean_text, iter_chunks
+from app.utils.metrics import RequestTimings
+from app.utils.process_doc import summarizer_agent, translator_agent, tts_stage
+
+QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+# Chunk size when the prompt does not ask for a summary
+PASSTHROUGH_CHARS = int(os.getenv("PIPELINE_CHUNK_CHARS", "1000"))
+# Chunks each stage keeps in flight on its pool
+STAGE_CONCURRENCY = int(os.getenv("PIPELINE_STAGE_CONCURRENCY", "4"))
+POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _summarize_chunk(chunk: str, limits: tuple) -> str:
+    [(summary, error)] = summarizer_agent.summarize_chunks([chunk], limits)
+    if summary is None:
+        raise RuntimeError(error)
+    return summary
+
+
+class ChunkPipeline:
+    def __init__(
+        self,
+        content: str,
+        intents: list,
+        constraints: dict,
+        timer: RequestTimings,
+        on_finished=None,
+    ):
+        self.content = content
+        self.intents = intents
+        self.constraints = constraints
+        self.timer = timer
+        # Called once no stage (nor any work it submitted) is running anymore
+        self.on_finished = on_finished
+        self.stop = threading.Event()
+        self._state_lock = threading.Lock()
+        self._started = False
+        self._running = 0
+        self._finished = False
+        self.events = queue.Queue(maxsize=QUEUE_SIZE * 4)
+        self.stages = [self._source]
+        if "translate" in intents:
+            self.stages.append(self._translate)
+        if "tts" in intents or "play" in intents:
+            self.stages.append(self._tts)
+
+    def _put(self, q: queue.Queue, item):
+        # Blocks while the queue is full (backpressure), but notices cancellation
+        while True:
+            if self.stop.is_set():
+                raise _Cancelled()
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        while True:
+            if self.stop.is_set():
+                raise _Cancelled()
+            try:
+                return q.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _emit(self, event: str, data: dict):
+        self._put(self.events, (event, data))
+
+    def _emit_error(self, stage: str, index, error):
+        self._emit("error", {"stage": stage, "index": index, "error": str(error)})
+
+    def _iter_input(self, in_q: queue.Queue):
+        while True:
+            item = self._get(in_q)
+            if item is _DONE:
+                return
+            yield item
+
+    def _submit(self, pool, fn, *args):
+        # A busy pool delays the stream instead of failing it
+        while True:
+            if self.stop.is_set():
+                raise _Cancelled()
+            try:
+                return pool.submit(fn, *args)
+            except PoolFullError:
+                self.stop.wait(POLL_SECONDS)
+
+    def _map_ordered(self, items, pool, name: str, fn):
+        """
+        Run fn(text) for (index, text) items on the pool with up to
+        STAGE_CONCURRENCY in flight; yields (index, result, error) in order.
+        """
+
+        def timed(text):
+            with self.timer.stage(name, len(text)):
+                return fn(text)
+
+        in_flight = deque()
+
+        def finish():
+            index, future = in_flight.popleft()
+            try:
+                return index, future.result(), None
+            except Exception as e:
+                return index, None, e
+
+        try:
+            for index, text in items:
+                in_flight.append((index, self._submit(pool, timed, text)))
+                if len(in_flight) >= STAGE_CONCURRENCY:
+                    yield finish()
+            while in_flight:
+                yield finish()
+        finally:
+            # On cancellation, drop queued work and wait out what already runs
+            for _, future in in_flight:
+                future.cancel()
+            wait([future for _, future in in_flight])
+
+    def _source(self, in_q, out_q):
+        text = clean_text(self.content or "")
+        if "summarize" not in self.intents:
+            for index, chunk in enumerate(iter_chunks([text], PASSTHROUGH_CHARS)):
+                self._forward("chunk", index, chunk, out_q)
+            return
+        chunks = [chunk["text"] for chunk in summarizer_agent.iter_chunks([text])]
+        # The streamed summaries add up to roughly the requested length
+        limits = summarizer_agent.chunk_limits(
+            len(chunks),
+            lines=self.constraints.get("lines"),
+            chars=self.constraints.get("chars"),
+            words=self.constraints.get("words"),
+        )
+        results = self._map_ordered(
+            enumerate(chunks),
+            cpu_pool,
+            "summarize_chunk",
+            lambda chunk: _summarize_chunk(chunk, limits),
+        )
+        with closing(results):
+            for index, summary, error in results:
+                if error:
+                    self._emit_error("summarize", index, error)
+                else:
+                    self._forward("summary", index, summary, out_q)
+
+    def _translate(self, in_q, out_q):
+        target_lang = self.constraints.get("target_lang")
+        results = self._map_ordered(
+            self._iter_input(in_q),
+            io_pool,
+            "translate_chunk",
+            lambda text: translator_agent.translate(text, target_lang=target_lang),
+        )
+        with closing(results):
+            for index, translated, error in results:
+                if error or translated is None:
+                    self._emit_error(
+                        "translate", index, error or "Translation failed."
+                    )
+                else:
+                    self._forward("translate", index, translated, out_q)
+
+    def _tts(self, in_q, out_q):
+        results = self._map_ordered(
+            self._iter_input(in_q),
+            io_pool,
+            "tts_chunk",
+            lambda text: tts_stage(text, self.constraints),
+        )
+        with closing(results):
+            for index, audio_url, error in results:
+                if error or audio_url is None:
+                    self._emit_error("tts", index, error or "Speech synthesis failed.")
+                else:
+                    self._emit("tts", {"index": index, "audio_url": audio_url})
+
+    def _forward(self, event: str, index: int, text: str, out_q):
+        """Report a chunk's result and hand it to the next stage, if any."""
+        self._emit(event, {"index": index, "text": text})
+        if out_q is not None:
+            self._put(out_q, (index, text))
+
+    def _run_stage(self, stage, in_q, out_q):
+        """Run one stage, then signal end-of-stream downstream (even on failure)."""
+        try:
+            try:
+                stage(in_q, out_q)
+            except _Cancelled:
+                return
+            except Exception as e:
+                self._emit_error(stage.__name__.strip("_"), None, e)
+                # Drain the rest of the input so upstream is never stuck
+                if in_q is not None:
+                    for _ in self._iter_input(in_q):
+                        pass
+            if out_q is not None:
+                self._put(out_q, _DONE)
+            else:
+                self._put(self.events, _DONE)
+        except _Cancelled:
+            pass
+        finally:
+            with self._state_lock:
+                self._running -= 1
+                last = self._running == 0
+            if last:
+                self._finish()
+
+    def _finish(self):
+        with self._state_lock:
+            if self._finished:
+                return
+            self._finished = True
+        if self.on_finished is not None:
+            self.on_finished()
+
+    def start(self):
+        with self._state_lock:
+            if self._started or self.stop.is_set():
+                return
+            self._started = True
+            self._running = len(self.stages)
+        in_q = None
+        for position, stage in enumerate(self.stages):
+            last = position == len(self.stages) - 1
+            out_q = None if last else queue.Queue(maxsize=QUEUE_SIZE)
+            threading.Thread(
+                target=self._run_stage,
+                args=(stage, in_q, out_q),
+                name=f"pipeline{stage.__name__}",
+                daemon=True,
+            ).start()
+            in_q = out_q
+
+    def close(self):
+        """
+        Stop the stages. on_finished runs once they have all exited, or right
+        away if the pipeline never started.
+        """
+        self.stop.set()
+        with self._state_lock:
+            idle = not self._started
+            self._started = True
+        if idle:
+            self._finish()
+
+    def events_iter(self):
+        """Start the stages and yield their events; closing it stops them."""
+        self.start()
+        try:
+            while True:
+                try:
+                    item = self._get(self.events)
+                except _Cancelled:
+                    return
+                if item is _DONE:
+                    break
+                yield item
+            yield "done", {"timings": self.timer.as_dict()}
+        finally:
+            self.close()
+
+
+def iter_pipeline_events(
+    content: str, intents: list, constraints: dict, timer: RequestTimings = None
+):
+    """
+    Yield (event, data) pairs as chunks move through the pipeline: summary /
+    translate / tts (or chunk when nothing else applies) per chunk, error for
+    chunks that failed, then done. Closing the generator stops the stages.
+    """
+    pipeline = ChunkPipeline(content, intents, constraints, timer or RequestTimings())
+    return pipeline.events_iter()
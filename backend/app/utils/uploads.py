@@ -0,0 +1,132 @@
+# app/utils/uploads.py
+"""
+Streaming document uploads: chunked writes to a temp file, atomic rename,
+on-the-fly content hashing for deduplication, and early size/type checks.
+New uploads are recorded in the document catalog.
+"""
+
+import codecs
+import hashlib
+import os
+import tempfile
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.utils.doc_catalog import catalog
+from app.utils.extract_cache import extraction_cache
+from app.utils.helpers import UPLOAD_CHUNK_BYTES, MAX_UPLOAD_BYTES, ALLOWED_EXTENSIONS
+
+# Leading bytes each binary type must start with
+MAGIC_BYTES = {".pdf": b"%PDF", ".docx": b"PK\x03\x04"}
+
+
+class UploadRejected(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def safe_filename(filename: str) -> str:
+    """Strip any directory parts so uploads cannot escape the upload dir."""
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    if not name or name.startswith("."):
+        raise UploadRejected("Invalid file name.")
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise UploadRejected(f"Unsupported file type: {ext}", status_code=415)
+    return name
+
+
+def find_duplicate(upload_dir: str, digest: str):
+    """Name of an existing upload with this content hash, if any."""
+    # Indexed catalog lookup instead of hashing every file in the directory
+    name = catalog.find_by_hash(digest)
+    if name and os.path.isfile(os.path.join(upload_dir, name)):
+        return name
+    return None
+
+
+def _check_type(ext: str, first_chunk: bytes):
+    magic = MAGIC_BYTES.get(ext)
+    if magic and not first_chunk.startswith(magic):
+        raise UploadRejected(f"File content does not look like {ext}.", 415)
+
+
+def _write_chunk(f, chunk: bytes, digest, text_decoder):
+    """Validate, hash and write one chunk; runs in a worker thread."""
+    if text_decoder:
+        try:
+            text_decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise UploadRejected("Text files must be UTF-8.", 415)
+    digest.update(chunk)
+    f.write(chunk)
+
+
+async def save_upload(
+    file: UploadFile, upload_dir: str, max_bytes: int = MAX_UPLOAD_BYTES
+) -> dict:
+    """
+    Stream an upload into upload_dir.
+    Returns dict with keys filename, sha256, size and status:
+        - uploaded:  new content written
+        - unchanged: same name already holds identical content
+        - duplicate: new name, but identical content is already stored under
+          another name (filename)
+    Raises UploadRejected for bad names, types or sizes.
+    """
+    filename = safe_filename(file.filename)
+    ext = os.path.splitext(filename)[1].lower()
+    digest = hashlib.sha256()
+    text_decoder = codecs.getincrementaldecoder("utf-8")() if ext == ".txt" else None
+    size = 0
+
+    # Hidden temp name in the same directory, so the final rename is atomic
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-", suffix=ext)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if size == 0:
+                    _check_type(ext, chunk)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(
+                        f"File exceeds the upload limit of {max_bytes} bytes.", 413
+                    )
+                await run_in_threadpool(
+                    _write_chunk, tmp, chunk, digest, text_decoder
+                )
+        if size == 0:
+            raise UploadRejected("Uploaded file is empty.")
+        if text_decoder:
+            # A multibyte sequence cut off at the end of the file
+            try:
+                text_decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                raise UploadRejected("Text files must be UTF-8.", 415)
+
+        sha256 = digest.hexdigest()
+        result = {"filename": filename, "sha256": sha256, "size": size}
+        final_path = os.path.join(upload_dir, filename)
+        if os.path.exists(final_path):
+            current = await run_in_threadpool(
+                extraction_cache.file_digest, final_path
+            )
+            if current == sha256:
+                return {**result, "status": "unchanged"}
+        else:
+            # Only new names are deduplicated; re-uploading a name replaces it
+            duplicate = await run_in_threadpool(find_duplicate, upload_dir, sha256)
+            if duplicate:
+                return {**result, "filename": duplicate, "status": "duplicate"}
+
+        os.replace(tmp_path, final_path)
+        tmp_path = None
+        extraction_cache.invalidate(final_path)
+        await run_in_threadpool(catalog.record_upload, filename, sha256, size)
+        return {**result, "status": "uploaded"}
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+"""
+Reproducible benchmarks for the document pipeline.
+Run from the backend directory: python -m benchmarks.run --help
+"""
@@ -0,0 +1,115 @@
+# benchmarks/e2e.py
+"""
+End-to-end load test of /agents/process-prompt/.
+The app is served by uvicorn in a background thread of this process (so stub
+models installed through the registry apply) and driven by a pool of
+blocking HTTP clients, each keeping one request in flight.
+"""
+
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.micro import percentile
+
+PROMPTS = [
+    "Summarize this document in 3 lines",
+    "Summarize this in 60 words and translate to Hindi",
+    "Give a brief summary, translate to Telugu and read aloud",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(app, timeout: float = 30.0) -> tuple:
+    """Serve app on a free port; returns (server, base_url)."""
+    import uvicorn
+
+    port = _free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    server.install_signal_handlers = lambda: None  # not the main thread
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + timeout
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start in time")
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+REJECTED = "rejected (429)"
+
+
+def _post_prompt(base_url: str, file_name: str, prompt: str, timeout: float):
+    """Returns (seconds, error or None); admission rejections are REJECTED."""
+    data = urllib.parse.urlencode({"file_name": file_name, "prompt": prompt})
+    request = urllib.request.Request(
+        f"{base_url}/agents/process-prompt/", data=data.encode("utf-8")
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        error = REJECTED if e.code == 429 else str(e)
+        return time.perf_counter() - start, error
+    except Exception as e:
+        return time.perf_counter() - start, str(e)
+    elapsed = time.perf_counter() - start
+    error = body.get("error") or next(
+        (
+            value.get("error")
+            for value in body.get("results", {}).values()
+            if isinstance(value, dict) and value.get("error")
+        ),
+        None,
+    )
+    return elapsed, error
+
+
+def run_load(
+    base_url: str,
+    file_names: list,
+    requests: int = 60,
+    concurrency: int = 4,
+    timeout: float = 300.0,
+) -> dict:
+    """Fire `requests` prompts at `concurrency` in flight, cycling docs and prompts."""
+    jobs = [
+        (file_names[i % len(file_names)], PROMPTS[i % len(PROMPTS)])
+        for i in range(requests)
+    ]
+    # One untimed pass per document warms lazy models and extraction
+    for file_name in file_names:
+        _post_prompt(base_url, file_name, PROMPTS[0], timeout)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        outcomes = list(
+            clients.map(lambda job: _post_prompt(base_url, *job, timeout), jobs)
+        )
+    wall = time.perf_counter() - start
+
+    latencies = [seconds for seconds, _ in outcomes]
+    errors = [error for _, error in outcomes if error and error != REJECTED]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "rejected": sum(error == REJECTED for _, error in outcomes),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
@@ -0,0 +1,89 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks for the text helpers, extraction and intent detection.
+Each case is timed over several iterations after one warmup call.
+"""
+
+import statistics
+import time
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize_samples(samples: list) -> dict:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    return {
+        "iterations": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "min_ms": min(samples) * 1000,
+    }
+
+
+def time_case(fn, iterations: int, setup=None) -> dict:
+    fn()  # warmup: imports, lazy models, caches that are not reset by setup
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize_samples(samples)
+
+
+def run_micro(corpus: dict, iterations: int = 5) -> dict:
+    """
+    Time the helpers over the generated corpus ({extension: path}).
+    Must run after the app environment (stub models, cache dirs) is set up.
+    """
+    from app.utils.helpers import (
+        chunk_text,
+        clean_text,
+        extract_text,
+        iter_token_chunks,
+    )
+    from app.utils.extract_cache import extraction_cache
+    from app.utils import intent_detector
+
+    text = extract_text(corpus[".txt"])["text"]
+    prompts = [
+        "Summarize this document in 3 lines",
+        "Translate the summary to Hindi and read it aloud",
+        "Give me a brief summary in 50 words and play the audio in Telugu",
+    ]
+
+    def clear_intent_caches():
+        intent_detector._detect_intent_cached.cache_clear()
+        intent_detector._embed_prompt.cache_clear()
+
+    cases = {
+        "chunk_text": lambda: chunk_text(text, max_chars=1000),
+        "clean_text": lambda: clean_text(text),
+        "iter_token_chunks": lambda: list(iter_token_chunks([text], max_tokens=900)),
+        "detect_intent_cold": (
+            lambda: [intent_detector.detect_intent(p) for p in prompts],
+            clear_intent_caches,
+        ),
+        "detect_intent_cached": lambda: [
+            intent_detector.detect_intent(p) for p in prompts
+        ],
+    }
+    for ext, path in corpus.items():
+        cases[f"extract_text{ext}"] = lambda path=path: extract_text(path)
+        cases[f"extract_cached{ext}"] = lambda path=path: extraction_cache.extract(
+            path
+        )
+
+    results = {}
+    for name, case in cases.items():
+        fn, setup = case if isinstance(case, tuple) else (case, None)
+        results[name] = time_case(fn, iterations, setup)
+    results["_input"] = {"chars": len(text), "words": len(text.split())}
+    return results
@@ -0,0 +1,203 @@
+# benchmarks/run.py
+"""
+Benchmark entry point.
+
+    python -m benchmarks.run --size medium --output results.json
+    python -m benchmarks.run --output new.json --compare results.json
+
+Runs in a throwaway workspace (uploads, caches, catalog) with translation
+and TTS served by local stubs. Models are stubbed too unless --real-models
+is given. Results are written as JSON; --compare reports metrics that got
+worse than the baseline by more than --tolerance and exits non-zero.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks import corpus, stubs  # noqa: E402
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DOCABILITY pipeline benchmarks")
+    parser.add_argument("--size", choices=sorted(corpus.SIZES), default="small")
+    parser.add_argument("--words", type=int, help="corpus size, overrides --size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--stub-latency-ms", type=float, default=20.0, help="per stub service call"
+    )
+    parser.add_argument(
+        "--summarizer-ms", type=float, default=0.0, help="per chunk, stub summarizer"
+    )
+    parser.add_argument(
+        "--real-models", action="store_true", help="load the real summarizer/encoder"
+    )
+    parser.add_argument(
+        "--cached", action="store_true", help="keep the stage result cache enabled"
+    )
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-e2e", action="store_true")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10, help="allowed relative slowdown"
+    )
+    parser.add_argument("--workspace", help="keep uploads/caches here (default: temp)")
+    return parser.parse_args(argv)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure_environment(translate_url: str, tts_url: str, cached: bool):
+    """Point the app at the stub services; must run before app modules load."""
+    os.environ.update(
+        {
+            "TRANSLATOR_BACKEND": "http",
+            "TRANSLATOR_URL": translate_url,
+            "TRANSLATOR_RATE": "0",
+            "TTS_BACKEND": "http",
+            "TTS_URL": tts_url,
+            "WARMUP_MODELS": "",
+            "JOB_WORKERS": "0",
+        }
+    )
+    if not cached:
+        os.environ["RESULT_CACHE_MAX_ENTRIES"] = "0"
+
+
+def flatten_metrics(results: dict) -> dict:
+    """{"micro.chunk_text.p50_ms": ..., "e2e.throughput_rps": ...}"""
+    metrics = {}
+    for name, case in results.get("micro", {}).items():
+        for key, value in case.items():
+            if key.endswith("_ms"):
+                metrics[f"micro.{name}.{key}"] = value
+    for key, value in (results.get("e2e") or {}).items():
+        if key.endswith("_ms") or key == "throughput_rps":
+            metrics[f"e2e.{key}"] = value
+    return metrics
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print a comparison table; returns the metrics that regressed."""
+    current = flatten_metrics(results)
+    previous = flatten_metrics(baseline)
+    regressions = []
+    print(f"\n{'metric':<45}{'baseline':>12}{'current':>12}{'change':>10}")
+    for metric in sorted(current.keys() & previous.keys()):
+        old, new = previous[metric], current[metric]
+        if not old:
+            continue
+        change = new / old - 1
+        # Latencies regress upwards, throughput downwards
+        worse = -change if metric.endswith("throughput_rps") else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(metric)
+        print(f"{metric:<45}{old:>12.2f}{new:>12.2f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    words = args.words or corpus.SIZES[args.size]
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    workspace = args.workspace or tempfile.mkdtemp(prefix="docability-bench-")
+    workspace = os.path.abspath(workspace)
+    cwd = os.getcwd()
+
+    translate_server = stubs.start_server(stubs.TranslateHandler, args.stub_latency_ms)
+    tts_server = stubs.start_server(stubs.TTSHandler, args.stub_latency_ms)
+    configure_environment(
+        stubs.server_url(translate_server, "/translate"),
+        stubs.server_url(tts_server, "/tts"),
+        args.cached,
+    )
+    try:
+        docs = corpus.build_corpus(
+            os.path.join(workspace, "uploaded_docs"), words, args.seed
+        )
+        # The app resolves uploads, caches and databases relative to the cwd
+        os.chdir(workspace)
+        from app.main import app
+
+        if not args.real_models:
+            stubs.install_stub_models(args.summarizer_ms / 1000)
+
+        results = {
+            "meta": {
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "words": words,
+                "args": vars(args),
+            }
+        }
+        if not args.skip_micro:
+            from benchmarks.micro import run_micro
+
+            results["micro"] = run_micro(docs, args.iterations)
+        if not args.skip_e2e:
+            from benchmarks.e2e import start_app, run_load
+
+            server, base_url = start_app(app)
+            try:
+                results["e2e"] = run_load(
+                    base_url,
+                    [os.path.basename(path) for path in docs.values()],
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                )
+            finally:
+                server.should_exit = True
+    finally:
+        os.chdir(cwd)
+        translate_server.shutdown()
+        tts_server.shutdown()
+        if not args.workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({k: v for k, v in results.items() if k != "meta"}, indent=2))
+    print(f"\nResults written to {output}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than "
+                  f"{args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
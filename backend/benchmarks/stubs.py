@@ -0,0 +1,129 @@
+# benchmarks/stubs.py
+"""
+Local stand-ins for external services and models.
+- Translation: LibreTranslate-style server for TRANSLATOR_BACKEND=http
+- TTS: server returning silent MP3 frames for TTS_BACKEND=http
+- Models: cheap summarizer/encoder installed via model_registry.override
+Each stub server sleeps a fixed latency per call so the pipeline's
+concurrency (pools, batching, rate limits) is exercised like the real thing.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz)
+SILENT_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+CHARS_PER_FRAME = 20
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", "0"))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TranslateHandler(_StubHandler):
+    def do_POST(self):
+        payload = self._read_json()
+        time.sleep(self.latency)
+        translated = f"[{payload.get('target', '')}] {payload.get('q', '')}"
+        body = json.dumps({"translatedText": translated}).encode("utf-8")
+        self._send(body, "application/json")
+
+
+class TTSHandler(_StubHandler):
+    def do_POST(self):
+        payload = self._read_json()
+        time.sleep(self.latency)
+        frames = max(1, len(payload.get("text", "")) // CHARS_PER_FRAME)
+        self._send(SILENT_FRAME * frames, "audio/mpeg")
+
+
+def start_server(handler, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Serve handler on a free localhost port in a daemon thread."""
+    handler = type(handler.__name__, (handler,), {"latency": latency_ms / 1000})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_url(server: ThreadingHTTPServer, path: str) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{path}"
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with the call signature the summarizer uses."""
+
+    def __call__(self, text, add_special_tokens=True, **kwargs):
+        return {"input_ids": list(range(len(text.split())))}
+
+
+class StubSummarizer:
+    """Summarization pipeline stand-in: keeps the first max_length words."""
+
+    tokenizer = StubTokenizer()
+
+    def __init__(self, seconds_per_item: float = 0.0):
+        self.seconds_per_item = seconds_per_item
+
+    def __call__(self, texts, max_length=130, min_length=30, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        time.sleep(self.seconds_per_item * len(texts))
+        return [
+            {"summary_text": " ".join(text.split()[:max_length])} for text in texts
+        ]
+
+
+class StubEncoder:
+    """
+    SentenceTransformer stand-in: hashed bag-of-words vectors, so texts that
+    share words still score as similar.
+    """
+
+    dimension = 384
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                digest = hashlib.blake2b(word.encode("utf-8"), digest_size=4)
+                column = int.from_bytes(digest.digest(), "little") % self.dimension
+                matrix[row, column] += 1
+        if normalize_embeddings:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.maximum(norms, 1e-12)
+        return matrix[0] if single else matrix
+
+
+def install_stub_models(summarizer_seconds: float = 0.0):
+    """
+    Replace the heavy shared models with the stubs above. Call before the
+    first request; intent template embeddings are then built with the stub
+    encoder (keep INTENT_EMBEDDING_CACHE_DIR separate from real runs).
+    """
+    from app.utils.model_registry import model_registry
+
+    model_registry.override("summarizer", lambda: StubSummarizer(summarizer_seconds))
+    model_registry.override("intent_encoder", StubEncoder)
@@ -1,23 +1,218 @@
 # startup.py
 
+import gc
+import glob
 import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
 import time
 import threading
 import webbrowser
 import uvicorn
 from dotenv import load_dotenv
-from app.utils.env_vars import ENVIRONMENT
+from app.utils.env_vars import ENVIRONMENT, PREFORK_WORKER
 from app.utils.constants import DEV_ENV
 
 # Load environment variables from .env
 load_dotenv()
 
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+# Recycle a worker after this many requests (0 = never), with up to 10% jitter
+# so workers do not all restart at once
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "0") or 0)
+
 
 def open_docs():
     time.sleep(1)
     webbrowser.open("http://127.0.0.1:8000/docs")
 
 
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, workers: int):
+    """Body of a forked worker: serve on the shared socket until recycled."""
+    os.environ[PREFORK_WORKER] = "1"
+    if "torch" in sys.modules:
+        # Split the cores between workers instead of oversubscribing them
+        sys.modules["torch"].set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    max_requests = None
+    if WORKER_MAX_REQUESTS > 0:
+        max_requests = WORKER_MAX_REQUESTS + random.randint(
+            0, WORKER_MAX_REQUESTS // 10
+        )
+    config = uvicorn.Config(app, limit_max_requests=max_requests, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork(target, *args) -> int:
+    """Run target(*args) in a forked child that exits when it returns."""
+    pid = os.fork()
+    if pid == 0:
+        # Drop the parent's handlers, which would signal the other children
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        code = 0
+        try:
+            target(*args)
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def _sweep_audio():
+    """Sole evictor of the shared audio directory while workers run."""
+    from app.utils.audio_store import audio_store
+
+    audio_store.sweep_forever(rescan=True)
+
+
+def _metrics_dir() -> tuple:
+    """(directory for worker metric snapshots, whether it is a temporary one)."""
+    from app.utils.metrics import METRICS_DIR
+
+    directory = os.getenv(METRICS_DIR)
+    if not directory:
+        directory = tempfile.mkdtemp(prefix="docability-metrics-")
+        os.environ[METRICS_DIR] = directory
+        return directory, True
+    os.makedirs(directory, exist_ok=True)
+    # Snapshots of a previous run would be counted again
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+    return directory, False
+
+
+def _backfill_catalog(upload_dir: str):
+    from app.utils.doc_catalog import sync_catalog
+    from app.utils.pdf_extract import shutdown_pdf_pool
+
+    try:
+        sync_catalog(upload_dir)
+    finally:
+        shutdown_pdf_pool()
+
+
+def _limit_torch_threads():
+    """Keep torch to one thread in the parent so no pool exists at fork time."""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(1)
+    torch.set_num_interop_threads(1)
+
+
+def _share_pdf_workers(web_processes: int):
+    """
+    Split the cores between the processes that each run their own PDF
+    extraction pool (web and job workers), unless PDF_WORKERS is set.
+    The children inherit it through the environment.
+    """
+    if int(os.getenv("PDF_WORKERS", "0") or 0):
+        return
+    processes = web_processes + int(os.getenv("JOB_WORKERS", "0") or 0)
+    os.environ["PDF_WORKERS"] = str(max(1, (os.cpu_count() or 1) // processes))
+
+
+def serve_prefork(host: str = HOST, port: int = PORT, workers: int = WEB_WORKERS):
+    """
+    Load the app and its models once, then fork workers that share the
+    listening socket. Model weights loaded before the fork are shared
+    copy-on-write; workers that exit (recycling or crash) are replaced.
+    """
+    sock = _bind_socket(host, port)
+    _share_pdf_workers(workers)
+    # Production workers should start warm: load every model unless told otherwise
+    os.environ.setdefault("WARMUP_MODELS", "all")
+    from app.main import app, start_job_workers, stop_job_workers
+    from app.routes.agent_routes import UPLOAD_DIR
+    from app.utils.model_registry import warmup_from_env
+
+    # The parent must not start threads or pools before forking: torch runs
+    # single-threaded during warm-up, and the catalog backfill (which may
+    # start the PDF process pool) runs in a child of its own
+    _limit_torch_threads()
+    warmup_from_env()
+    # Move everything loaded so far out of the collector's reach, so GC passes
+    # in the workers do not touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    from app.utils.metrics import archive_snapshot
+
+    metrics_dir, temporary = _metrics_dir()
+
+    def spawn_worker():
+        return _fork(_run_worker, app, sock, workers)
+
+    def spawn_sweeper():
+        return _fork(_sweep_audio)
+
+    # Long-running children and how to replace each when it exits
+    children = {}
+    for spawn in [spawn_worker] * workers + [spawn_sweeper]:
+        children[spawn()] = spawn
+    print(f"🚀 Serving on http://{host}:{port} with {workers} workers (prefork)")
+    _fork(_backfill_catalog, UPLOAD_DIR)
+    start_job_workers()
+
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        stopping.set()
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        if pid not in children:
+            continue  # the catalog backfill or a job worker process
+        spawn = children.pop(pid)
+        if spawn is spawn_worker:
+            # Keep the exited worker's counters in the merged /metrics
+            archive_snapshot(metrics_dir, pid)
+        if not stopping.is_set():
+            children[spawn()] = spawn
+    stop_job_workers()
+    sock.close()
+    if temporary:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def serve_single(host: str = HOST, port: int = PORT):
+    """
+    One process (Windows, or WEB_WORKERS=1); models warm in the startup event.
+    Never recycled, since nothing would restart it.
+    """
+    _share_pdf_workers(1)
+    print(f"🚀 Serving on http://{host}:{port} (single process)")
+    uvicorn.run("app.main:app", host=host, port=port)
+
+
 if __name__ == "__main__":
     env = os.getenv(ENVIRONMENT)
 
@@ -31,3 +226,8 @@ if __name__ == "__main__":
             reload=True,
             reload_excludes=[os.path.abspath(".venv")],
         )
+    elif hasattr(os, "fork") and WEB_WORKERS > 1:
+        serve_prefork()
+    else:
+        # No fork on Windows: fall back to a single worker
+        serve_single()
@@ -0,0 +1,40 @@
+from app.utils.helpers import iter_chunks
+
+
+def test_iter_chunks_splits_long_sentence_between_words():
+    words = [f"word{i:03d}" for i in range(40)]
+    sentence = " ".join(words) + "."
+    assert len(sentence) > 100
+
+    chunks = list(iter_chunks([sentence], max_chars=100))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks) == sentence
+    for chunk in chunks:
+        assert all(word.rstrip(".") in words for word in chunk.split())
+
+
+def test_iter_chunks_keeps_packing_after_long_sentence():
+    long_sentence = "alpha " * 30 + "end."
+    chunks = list(iter_chunks([long_sentence + " Short one."], max_chars=80))
+
+    assert chunks[-1].endswith("end. Short one.")
+    assert " ".join(chunks) == long_sentence.strip() + " Short one."
+
+
+def test_iter_chunks_cuts_single_overlong_word():
+    chunks = list(iter_chunks(["x" * 25], max_chars=10))
+
+    assert chunks == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_iter_chunks_prefers_clause_breaks():
+    sentence = (
+        "The encoder reads the whole input sequence, "
+        "the decoder then produces the translation one token at a time."
+    )
+    chunks = list(iter_chunks([sentence], max_chars=70))
+
+    assert chunks[0] == "The encoder reads the whole input sequence,"
+    assert " ".join(chunks) == sentence
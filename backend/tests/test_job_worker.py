@@ -0,0 +1,19 @@
+import app.utils.intent_detector as intent_detector
+from app.utils.job_queue import JobStore, FAILED
+from app.utils.job_worker import run_job
+
+
+def test_run_job_marks_job_failed_when_intent_detection_fails(tmp_path, monkeypatch):
+    def broken_detect_intent(*args, **kwargs):
+        raise RuntimeError("encoder failed to load")
+
+    monkeypatch.setattr(intent_detector, "detect_intent", broken_detect_intent)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.submit(str(tmp_path / "doc.txt"), "summarize this")
+    job = store.claim("test-worker")
+
+    run_job(store, job)
+
+    job = store.get(job["id"])
+    assert job["status"] == FAILED
+    assert "encoder failed to load" in job["error"]
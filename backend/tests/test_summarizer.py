@@ -0,0 +1,60 @@
+from app.agents.summarizer.agent import SummarizerAgent, CHUNK_TOKENS
+
+
+class WordTokenizer:
+    def __call__(self, text, add_special_tokens=False):
+        return {"input_ids": text.split()}
+
+
+class StubbornModel:
+    """Echoes its input unless max_length forces it to cut, like a model that
+    does not shrink long inputs; records every input it sees."""
+
+    tokenizer = WordTokenizer()
+
+    def __init__(self):
+        self.inputs = []
+
+    def __call__(self, batch, max_length, min_length, **kwargs):
+        self.inputs.extend(batch)
+        outputs = []
+        for text in batch:
+            words = text.split()
+            if max_length < 200:
+                words = words[:max_length]
+            outputs.append({"summary_text": " ".join(words)})
+        return outputs
+
+
+class StubAgent(SummarizerAgent):
+    summarizer = None
+
+
+def test_hierarchical_summary_keeps_every_window_when_reduce_stalls():
+    sentences = [f"Marker{i:03d} " + "filler words " * 10 + "end." for i in range(150)]
+    document = " ".join(sentences)
+    assert len(document.split()) > 3 * CHUNK_TOKENS
+    model = StubbornModel()
+    agent = StubAgent()
+    agent.summarizer = model
+
+    summary = agent.summarize_hierarchical(document, words=50)
+
+    assert summary is not None
+    assert len(summary.split()) <= 50
+    final_input = model.inputs[-1]
+    assert len(final_input.split()) <= CHUNK_TOKENS
+    # The last window still reaches the final pass instead of being dropped
+    *_, last_window = agent.iter_chunks([document])
+    assert last_window["text"].split()[0] in final_input
+
+
+def test_hierarchical_summary_fails_when_model_fails():
+    class BrokenModel(StubbornModel):
+        def __call__(self, batch, **kwargs):
+            raise RuntimeError("out of memory")
+
+    agent = StubAgent()
+    agent.summarizer = BrokenModel()
+
+    assert agent.summarize_hierarchical("word " * 3000) is None
@@ -0,0 +1,34 @@
+from app.agents.translator.engine import TranslationEngine
+
+
+class EchoBackend:
+    name = "echo"
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, text: str, dest: str) -> str:
+        self.calls.append(text)
+        return text
+
+
+def test_split_long_line_keeps_words_whole():
+    line = " ".join(f"networks{i}" for i in range(60)) + "."
+    engine = TranslationEngine(EchoBackend(), max_chars=100, rate=0)
+
+    pairs = engine.split(line)
+
+    assert len(pairs) > 1
+    assert all(len(batch) <= 100 for _, batch in pairs)
+    assert "".join(sep + batch for sep, batch in pairs) == line
+    for _, batch in pairs:
+        assert all(word.startswith("networks") for word in batch.split())
+
+
+def test_translate_rebuilds_split_text():
+    text = "Intro line.\n" + "a long clause, " * 20 + "end.\nLast line."
+    backend = EchoBackend()
+    engine = TranslationEngine(backend, max_chars=60, rate=0)
+
+    assert engine.translate(text, "fr") == text
+    assert len(backend.calls) > 1